@@ -0,0 +1,77 @@
+# Parse time and peak memory of the streaming table extractor vs. the full-page
+# BeautifulSoup parse it replaces. Saved pages in benchmarks/fixtures/
+# (per_game_*.html, standings_*.html, mvp_*.html) are used when present,
+# otherwise basketball-reference-shaped pages are generated.
+# Run from backend/: python benchmarks/bench_html.py
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.fixtures import per_game_page, standings_page, mvp_page
+from calculations.season_store import parse_per_game_html, _parse_per_game_soup
+from calculations.team_stats import parse_standings_html, _parse_standings_soup
+from calculations.mvp_calculations import parse_mvp_html, _parse_mvp_soup
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+REPEATS = 3
+
+PARSERS = {
+    'per_game': (parse_per_game_html, _parse_per_game_soup),
+    'standings': (parse_standings_html, _parse_standings_soup),
+    'mvp': (parse_mvp_html, _parse_mvp_soup),
+}
+
+
+def load_fixtures():
+    fixtures = []
+    for kind in PARSERS:
+        for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, f"{kind}_*.html"))):
+            with open(path, 'r', encoding='utf-8') as file:
+                fixtures.append((kind, os.path.basename(path), file.read()))
+    if not fixtures:
+        fixtures = [
+            ('per_game', 'synthetic per_game (735 players)', per_game_page(735)),
+            ('per_game', 'synthetic per_game (7350 players)', per_game_page(7350)),
+            ('standings', 'synthetic standings', standings_page()),
+            ('mvp', 'synthetic mvp', mvp_page()),
+        ]
+    return fixtures
+
+
+def measure(func, html):
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func(html)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def same_result(a, b):
+    if hasattr(a, 'equals'):
+        return list(a.columns) == list(b.columns) and a.astype(str).equals(b.astype(str))
+    return a == b
+
+
+def main():
+    print(f"{'fixture':<36} {'KiB':>7} {'soup ms':>8} {'stream ms':>10} {'soup MiB':>9} {'stream MiB':>11}")
+    for kind, name, html in load_fixtures():
+        stream, soup = PARSERS[kind]
+        stream_result, stream_time, stream_peak = measure(stream, html)
+        soup_result, soup_time, soup_peak = measure(soup, html)
+        if not same_result(stream_result, soup_result):
+            raise AssertionError(f"Streaming extractor disagrees with BeautifulSoup on {name}")
+        print(f"{name:<36} {len(html) / 1024:>7.0f} {soup_time * 1000:>8.1f} {stream_time * 1000:>10.1f}"
+              f" {soup_peak / 2 ** 20:>9.1f} {stream_peak / 2 ** 20:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# Compares the old per-player /result loop against the batched scoring kernel.
+# Run from backend/: python benchmarks/bench_scoring.py
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic import synthetic_per_game, synthetic_standings
+from calculations.player_stats import filter_player_data, get_mvp_data, calculate_score
+from calculations.team_stats import get_team
+from calculations.scoring import rank_season
+
+SIZES = [100, 1000, 2500, 5000, 10000]
+LOOP_LIMIT = 5000  # the quadratic loop gets very slow past this
+
+
+def per_player_ranking(filtered_player_data, all_teams, mvp):
+    # The loop routes.result used before the scoring kernel
+    result_data = []
+    for name in filtered_player_data['Player']:
+        player = get_mvp_data(filtered_player_data, name)
+        if player is None:
+            continue
+
+        player_team = get_team(all_teams, str(player[2]))
+        if not player_team:
+            continue
+
+        player_fullstats = list(player) + [player_team['Wins'], player_team['Rank']]
+        result_data.append({
+            'Player': name,
+            'MVP Score': round(calculate_score(player_fullstats), 2),
+            'MVP': (name == mvp)
+        })
+
+    result_data_sorted = sorted(result_data, key=lambda x: x['MVP Score'], reverse=True)
+    return list({player['Player']: player for player in result_data_sorted}.values())
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    value = func(*args)
+    return value, time.perf_counter() - start
+
+
+def main():
+    all_teams = synthetic_standings()
+    print(f"{'players':>8} {'filtered':>8} {'loop (s)':>10} {'kernel (s)':>11} {'speedup':>8}")
+    for size in SIZES:
+        data = synthetic_per_game(size)
+        filtered = filter_player_data(data, 0, 0, 0)
+        mvp = filtered['Player'].iloc[0]
+
+        kernel, kernel_time = timed(rank_season, filtered, all_teams, mvp)
+        if size <= LOOP_LIMIT:
+            loop, loop_time = timed(per_player_ranking, filtered, all_teams, mvp)
+            if loop != kernel:
+                raise AssertionError(f"Kernel ranking differs from the per-player loop at {size} players")
+            print(f"{size:>8} {len(filtered):>8} {loop_time:>10.3f} {kernel_time:>11.4f} {loop_time / kernel_time:>7.0f}x")
+        else:
+            print(f"{size:>8} {len(filtered):>8} {'-':>10} {kernel_time:>11.4f} {'-':>8}")
+
+
+if __name__ == '__main__':
+    main()
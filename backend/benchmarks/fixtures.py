@@ -0,0 +1,76 @@
+import numpy as np
+from benchmarks.synthetic import PER_GAME_COLUMNS, synthetic_per_game, synthetic_standings
+
+# basketball-reference-shaped pages for the parser benchmarks: the target table
+# surrounded by navigation, scripts and commented-out secondary tables.
+PER_GAME_STATS = {
+    "Player": "name_display", "Age": "age", "Team": "team_name_abbr", "Pos": "pos",
+}
+
+
+def _filler(n_blocks):
+    block = (
+        '<div class="nav"><ul>' + ''.join(f'<li><a href="/players/{i}.html">Link {i}</a></li>' for i in range(40))
+        + '</ul></div><script>var x = {"a": [1, 2, 3]};</script><p>Sports Reference content.</p>'
+    )
+    return block * n_blocks
+
+
+def _commented_table(table_id, n_rows):
+    rows = ''.join(f'<tr><th>{i}</th><td>{i * 2}</td><td>{i * 3}</td></tr>' for i in range(n_rows))
+    return f'<div class="placeholder"></div><!--\n<table id="{table_id}"><tbody>{rows}</tbody></table>\n-->'
+
+
+def per_game_page(n_players, seed=0):
+    data = synthetic_per_game(n_players, seed)
+    header = '<tr><th data-stat="ranker">Rk</th>' + ''.join(
+        f'<th data-stat="{PER_GAME_STATS.get(name, name.lower())}">{name}</th>' for name in PER_GAME_COLUMNS
+    ) + '</tr>'
+    body = []
+    for i, row in enumerate(data.itertuples(index=False), start=1):
+        cells = []
+        for name, value in zip(PER_GAME_COLUMNS, row):
+            if name == "Player":
+                value = f'<a href="/players/p/player{i}.html">{value}</a>'
+            elif name == "Team":
+                value = f'<a href="/teams/{value}/2024.html">{value}</a>'
+            cells.append(f'<td data-stat="{PER_GAME_STATS.get(name, name.lower())}">{value}</td>')
+        body.append(f'<tr><th data-stat="ranker">{i}</th>{"".join(cells)}</tr>')
+        if i % 20 == 0:
+            body.append('<tr class="thead">' + header[4:])
+    table = f'<table id="per_game_stats"><thead>{header}</thead><tbody>{"".join(body)}</tbody></table>'
+    return (
+        '<html><head><title>Per Game</title></head><body>' + _filler(30) + table
+        + _commented_table("per_game_stats_post", 200) + _filler(30) + '</body></html>'
+    )
+
+
+def standings_page(seed=0):
+    teams = synthetic_standings(seed)
+    halves = [teams[0::2], teams[1::2]]
+    tables = []
+    for table_id, conference in zip(["divs_standings_E", "divs_standings_W"], halves):
+        rows = ''.join(
+            f'<tr class="full_table"><th data-stat="team_name"><a href="/teams/{team["Team Abbreviation"]}/2024.html">'
+            f'{team["Team Name"]}</a>*</th><td data-stat="wins">{team["Wins"]}</td>'
+            f'<td data-stat="losses">{team["Losses"]}</td><td data-stat="win_loss_pct">{team["Win-Loss Percentage"]}</td></tr>'
+            for team in conference
+        )
+        tables.append(f'<table id="{table_id}"><thead><tr><th>Division</th><th>W</th><th>L</th><th>W/L%</th></tr></thead><tbody>{rows}</tbody></table>')
+    return (
+        '<html><body>' + _filler(20) + ''.join(tables)
+        + _commented_table("expanded_standings", 30) + _commented_table("team_vs_team", 30) + _filler(60) + '</body></html>'
+    )
+
+
+def mvp_page(n_years=70):
+    rng = np.random.default_rng(0)
+    rows = ''.join(
+        f'<tr><th data-stat="season"><a href="/leagues/NBA_{year}.html">{year - 1}-{str(year)[-2:]}</a></th>'
+        f'<td data-stat="lg_id"><a href="/leagues/NBA_{year}.html">NBA</a></td>'
+        f'<td data-stat="player"><a href="/players/x/mvp{year}.html">MVP {year}</a></td>'
+        f'<td data-stat="age">{rng.integers(22, 35)}</td></tr>'
+        for year in range(2025, 2025 - n_years, -1)
+    )
+    table = f'<table id="mvp_NBA"><thead><tr><th>Season</th><th>Lg</th><th>Player</th><th>Age</th></tr></thead><tbody>{rows}</tbody></table>'
+    return '<html><body>' + _filler(20) + table + _commented_table("mvp_ABA", 10) + _filler(40) + '</body></html>'
@@ -0,0 +1,392 @@
+# Offline benchmark suite for the main scoring and data paths, on synthetic
+# seasons at 1x, 10x and 100x real size. Results are compared against the JSON
+# baselines in benchmarks/baselines.json and regressions are flagged. Timings
+# only mean something on the machine that recorded them, so the baselines are
+# not committed (.gitignore): record them locally with --save on the commit you
+# compare against, then run the suite on your change.
+# Run from backend/:
+#   python benchmarks/suite.py --save          # record this machine's baselines
+#   python benchmarks/suite.py                 # compare against them
+#   python benchmarks/suite.py --scales 1,10 --only result
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCHMARK_DIR))
+
+from benchmarks.fixtures import per_game_page, standings_page
+
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, "baselines.json")
+SCALES = [1, 10, 100]
+SEASON_PLAYERS = 600   # rows in a real per-game table
+SEASONS = 25           # seasons in the multi-year training set
+MIN_TIME = 0.2         # repeat each case until it has run this long...
+MAX_REPEATS = 20       # ...or this many times
+MIN_REPEATS = 3
+REGRESSION_THRESHOLD = 0.25
+NOISE_FLOOR = 0.001    # differences under a millisecond are never flagged
+SYNTHETIC_YEARS = range(3000, 100000)  # synthetic seasons, never in the real caches
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    # Serves saved pages for basketball-reference URLs: any /leagues/NBA_<year>_per_game.html
+    # or _standings.html gets the fixture at the server's current scale
+    pages = {}
+
+    def do_GET(self):
+        kind = 'per_game' if self.path.endswith('_per_game.html') else 'standings'
+        body = self.pages[kind]
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fixture_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def isolate(tmp_dir, base_url, host):
+    # Point every cache and store at a scratch directory and every fetch at the fixture server.
+    # Must run before the calculations package is imported.
+    os.environ['BASKETBALL_REFERENCE_URL'] = base_url
+    from calculations import cache_manager, fetch, season_store, team_stats
+    from calculations.cache_manager import get_cache
+    from modeling import prepare
+    cache_manager.LAST_SEASON = SYNTHETIC_YEARS[-1]  # the synthetic seasons only ever reach the scratch store
+    fetch.fetcher = fetch.Fetcher(host_rates={host: (10000, 10000)}, cache_dir=os.path.join(tmp_dir, "http"))
+    season_store.STORE_DIR = os.path.join(tmp_dir, "season_store")
+    season_store.MANIFEST_FILE = os.path.join(season_store.STORE_DIR, "manifest.json")
+    team_stats.standings_cache = get_cache('standings', os.path.join(tmp_dir, "standings"))
+    prepare.checkpoint_cache = get_cache('checkpoints', os.path.join(tmp_dir, "checkpoints"))
+
+
+# Legacy implementations, kept here so their cost stays measurable after removal
+
+def legacy_bubble_sort(arr):
+    n = len(arr)
+    for i in range(n):
+        for j in range(0, n-i-1):
+            if arr[j]['Wins'] > arr[j+1]['Wins']:
+                arr[j], arr[j+1] = arr[j+1], arr[j]
+    return arr
+
+
+def legacy_get_team(all_teams, team_abb):
+    for team in all_teams:
+        if team['Team Abbreviation'] == team_abb:
+            return team
+    return None
+
+
+def legacy_averages_apply(player_stats, averages):
+    # modeling/averages.py's per-row score loop
+    player_stats = player_stats.copy()
+    for stat, column, avg_stat in [("PPG", "PPG", "Top 20 PPG Avg"), ("APG", "APG", "Top 20 APG Avg"),
+                                   ("RPG", "RPG", "Top 20 RPG Avg"), ("SPG", "SPG", "Top 20 SPG Avg"),
+                                   ("BPG", "BPG", "Top 20 BPG Avg"), ("eFG%", "effectFgPercent", "Top 20 eFG% Avg")]:
+        averages_dict = averages.set_index("Season")[avg_stat].to_dict()
+        player_stats[f"{stat}_Score"] = player_stats.apply(
+            lambda row: round(row[column] / averages_dict[row["season"]], 2)
+            if row["season"] in averages_dict and not pd.isna(row[column]) else None,
+            axis=1
+        )
+    return player_stats
+
+
+# Cases: setup(scale) -> zero-argument callable to time. max_scale keeps the
+# quadratic legacy paths from running for hours at 100x.
+
+class Case:
+    def __init__(self, name, setup, max_scale=100):
+        self.name = name
+        self.setup = setup
+        self.max_scale = max_scale
+
+
+def scaled_standings(scale):
+    from benchmarks.synthetic import synthetic_standings
+    teams = []
+    for copy in range(scale):
+        for team in synthetic_standings(copy):
+            teams.append(dict(team, **{'Team Abbreviation': f"{team['Team Abbreviation']}{copy or ''}"}))
+    return teams
+
+
+_years = iter(SYNTHETIC_YEARS)
+_runs = iter(range(1000000))
+
+
+def setup_result_cold(scale):
+    # Every call is a new season: fetch both pages, parse, store, index, score
+    from app import app
+    FixtureHandler.pages = {
+        'per_game': per_game_page(SEASON_PLAYERS * scale).encode('utf-8'),
+        'standings': standings_page().encode('utf-8'),
+    }
+    client = app.test_client()
+
+    def run():
+        response = client.get(f'/result?year={next(_years)}')
+        assert response.status_code == 200, response.data
+    return run
+
+
+def setup_result_warm(scale):
+    # Season already stored and indexed; only the ranking is recomputed
+    from app import app
+    from calculations.result_cache import result_cache
+    FixtureHandler.pages = {
+        'per_game': per_game_page(SEASON_PLAYERS * scale).encode('utf-8'),
+        'standings': standings_page().encode('utf-8'),
+    }
+    client = app.test_client()
+    year = next(_years)
+    client.get(f'/result?year={year}')
+
+    def run():
+        result_cache.invalidate(year)
+        response = client.get(f'/result?year={year}')
+        assert response.status_code == 200, response.data
+    return run
+
+
+def setup_parse_per_game(scale):
+    from calculations.season_store import parse_per_game_html
+    html = per_game_page(SEASON_PLAYERS * scale)
+    return lambda: parse_per_game_html(html)
+
+
+def setup_parse_per_game_soup(scale):
+    from calculations.season_store import _parse_per_game_soup
+    html = per_game_page(SEASON_PLAYERS * scale)
+    return lambda: _parse_per_game_soup(html)
+
+
+def setup_filtered_player_data(scale):
+    from calculations.player_stats import get_filtered_player_data
+    from calculations import threshold_index
+    FixtureHandler.pages = {'per_game': per_game_page(SEASON_PLAYERS * scale).encode('utf-8')}
+    year = next(_years)
+    get_filtered_player_data(year, 15, 50, 0.4)
+
+    def run():
+        threshold_index._season_indexes.clear()  # rebuild the index from the stored columns
+        return get_filtered_player_data(year, 15, 50, 0.4)
+    return run
+
+
+def _scoring_inputs(scale):
+    from benchmarks.synthetic import synthetic_per_game, synthetic_standings
+    from calculations.player_stats import filter_player_data
+    filtered = filter_player_data(synthetic_per_game(SEASON_PLAYERS * scale), 0, 0, 0)
+    return filtered, synthetic_standings(), filtered['Player'].iloc[0]
+
+
+def setup_score_loop(scale):
+    from benchmarks.bench_scoring import per_player_ranking
+    filtered, all_teams, mvp = _scoring_inputs(scale)
+    return lambda: per_player_ranking(filtered, all_teams, mvp)
+
+
+def setup_score_kernel(scale):
+    from calculations.scoring import rank_season
+    filtered, all_teams, mvp = _scoring_inputs(scale)
+    return lambda: rank_season(filtered, all_teams, mvp)
+
+
+def setup_bubble_sort(scale):
+    teams = scaled_standings(scale)
+    return lambda: legacy_bubble_sort(list(reversed(teams)))
+
+
+def setup_rank_teams(scale):
+    from calculations.team_stats import rank_teams
+    teams = scaled_standings(scale)
+    return lambda: rank_teams([dict(team) for team in reversed(teams)])
+
+
+def _team_lookups(scale):
+    teams = scaled_standings(scale)
+    abbreviations = [team['Team Abbreviation'] for team in teams] * 20
+    return teams, abbreviations
+
+
+def setup_get_team_linear(scale):
+    teams, abbreviations = _team_lookups(scale)
+    return lambda: [legacy_get_team(teams, abbreviation) for abbreviation in abbreviations]
+
+
+def setup_get_team_indexed(scale):
+    from calculations.team_stats import Standings
+    teams, abbreviations = _team_lookups(scale)
+    standings = Standings(teams)
+    return lambda: [standings.find(abbreviation) for abbreviation in abbreviations]
+
+
+def _player_stats(scale):
+    data_dir = os.path.join(os.path.dirname(BENCHMARK_DIR), "data")
+    player_stats = pd.read_csv(os.path.join(data_dir, "nba_player_stats.csv"))
+    averages = pd.read_csv(os.path.join(data_dir, "league_avgs.csv"))
+    player_stats = pd.concat([player_stats] * scale, ignore_index=True)
+    player_stats['season'] = player_stats['season'].apply(lambda x: f"{x}-{str(int(x) + 1)[-2:]}")
+    return player_stats, averages
+
+
+def setup_averages_apply(scale):
+    player_stats, averages = _player_stats(scale)
+    return lambda: legacy_averages_apply(player_stats, averages)
+
+
+def setup_add_score_columns(scale):
+    from calculations.normalization import add_score_columns
+    player_stats, averages = _player_stats(scale)
+    return lambda: add_score_columns(player_stats, averages)
+
+
+def setup_league_averages(scale):
+    from benchmarks.synthetic import synthetic_per_game
+    from calculations import league_averages
+    tables = {year: synthetic_per_game(SEASON_PLAYERS * scale, year) for year in range(1999, 1999 + SEASONS)}
+    league_averages.get_season_table = lambda year: tables[int(year)]
+    players = league_averages.league_player_table(tables)
+    return lambda: league_averages.league_averages(players)
+
+
+def setup_prepare_multi_year(scale):
+    # Every season is built from the fixture server into a fresh checkpoint directory
+    from calculations.cache_manager import get_cache
+    from calculations.mvp_calculations import normalize_name
+    from modeling import prepare
+    FixtureHandler.pages = {
+        'per_game': per_game_page(SEASON_PLAYERS * scale).encode('utf-8'),
+        'standings': standings_page().encode('utf-8'),
+    }
+    first = next(_years)
+    for _ in range(SEASONS - 1):
+        next(_years)
+    prepare.get_all_mvps = lambda: {}
+    built = prepare.build_multi_year(first, first + SEASONS - 1)  # ingest the seasons once
+    # Seasons that fail are only reported on the (silenced) stdout, so check them
+    # here and in run(); otherwise a broken build times as a large speedup
+    assert len(built) and built['Year'].nunique() == SEASONS, f"built {built['Year'].nunique() if len(built) else 0} of {SEASONS} seasons"
+    # One MVP per synthetic season (its top scorer), so the balancing step has something to balance
+    mvps = built.sort_values('PTS').groupby('Year')['Player'].last()
+    prepare.get_all_mvps = lambda: {str(year): normalize_name(player) for year, player in mvps.items()}
+
+    def run():
+        prepare.checkpoint_cache = get_cache('checkpoints', os.path.join(TMP_DIR, f"checkpoints_{next(_runs)}"))
+        data = prepare.prepare_clean_multi_year(first, first + SEASONS - 1)
+        assert len(data) and data['Year'].nunique() == SEASONS, f"balanced data covers {data['Year'].nunique() if len(data) else 0} of {SEASONS} seasons"
+        return data
+    return run
+
+
+CASES = [
+    Case('result_cold', setup_result_cold),
+    Case('result_warm', setup_result_warm),
+    Case('parse_per_game', setup_parse_per_game),
+    Case('parse_per_game_soup', setup_parse_per_game_soup, max_scale=10),
+    Case('filtered_player_data', setup_filtered_player_data),
+    Case('score_loop_legacy', setup_score_loop, max_scale=10),
+    Case('score_kernel', setup_score_kernel),
+    Case('bubble_sort_legacy', setup_bubble_sort, max_scale=10),
+    Case('rank_teams', setup_rank_teams),
+    Case('get_team_linear_legacy', setup_get_team_linear, max_scale=10),
+    Case('get_team_indexed', setup_get_team_indexed),
+    Case('averages_apply_legacy', setup_averages_apply, max_scale=10),
+    Case('add_score_columns', setup_add_score_columns),
+    Case('league_averages', setup_league_averages),
+    Case('prepare_multi_year', setup_prepare_multi_year, max_scale=10),
+]
+
+
+def measure(run):
+    times = []
+    started = time.perf_counter()
+    while len(times) < MIN_REPEATS or (time.perf_counter() - started < MIN_TIME and len(times) < MAX_REPEATS):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return {'min': min(times), 'median': statistics.median(times), 'repeats': len(times)}
+
+
+def load_baselines():
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE, 'r') as file:
+        return json.load(file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the scoring and data pipelines.")
+    parser.add_argument('--scales', default=','.join(map(str, SCALES)), help="comma-separated size multipliers")
+    parser.add_argument('--only', default='', help="run cases whose name contains this")
+    parser.add_argument('--save', action='store_true', help="write the results as the new baselines")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="flag a case when its best time is this much slower than the baseline")
+    args = parser.parse_args()
+    scales = [int(scale) for scale in args.scales.split(',')]
+
+    baselines = load_baselines()
+    if not baselines and not args.save:
+        print(f"No baselines at {BASELINE_FILE}; run with --save first to record this machine's timings")
+    results = {}
+    regressions = []
+    print(f"{'case':<26} {'scale':>5} {'min (ms)':>10} {'median (ms)':>11} {'baseline':>10} {'change':>8}")
+    for case in CASES:
+        if args.only not in case.name:
+            continue
+        for scale in scales:
+            if scale > case.max_scale:
+                continue
+            key = f"{case.name}@{scale}x"
+            with contextlib.redirect_stdout(io.StringIO()):  # the pipelines' own warnings
+                result = measure(case.setup(scale))
+            results[key] = result
+
+            baseline = baselines.get(key)
+            change = ''
+            if baseline:
+                ratio = result['min'] / baseline['min'] - 1
+                change = f"{ratio:+.0%}"
+                if ratio > args.threshold and result['min'] - baseline['min'] > NOISE_FLOOR:
+                    regressions.append(key)
+                    change += ' !'
+            print(f"{case.name:<26} {scale:>5} {result['min'] * 1000:>10.3f} {result['median'] * 1000:>11.3f} "
+                  f"{baseline['min'] * 1000 if baseline else float('nan'):>10.3f} {change:>8}")
+
+    if args.save:
+        baselines.update(results)
+        with open(BASELINE_FILE, 'w') as file:
+            json.dump(baselines, file, indent=2, sort_keys=True)
+        print(f"Saved {len(results)} baselines to {BASELINE_FILE}")
+
+    if regressions:
+        print(f"Regressions (> {args.threshold:.0%} slower than baseline): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    TMP_DIR = tempfile.mkdtemp(prefix="mvp_bench_")
+    SERVER = start_fixture_server()
+    host = f"127.0.0.1:{SERVER.server_port}"
+    isolate(TMP_DIR, f"http://{host}", host)
+    sys.exit(main())
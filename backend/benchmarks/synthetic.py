@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+# Column layout of basketball-reference's per-game table (after dropping "Rk")
+PER_GAME_COLUMNS = [
+    "Player", "Age", "Team", "Pos", "G", "GS", "MP", "FG", "FGA", "FG%",
+    "3P", "3PA", "3P%", "2P", "2PA", "2P%", "eFG%", "FT", "FTA", "FT%",
+    "ORB", "DRB", "TRB", "AST", "STL", "BLK", "TOV", "PF", "PTS", "Awards",
+]
+TEAM_ABBREVIATIONS = [
+    "ATL", "BOS", "BRK", "CHI", "CHO", "CLE", "DAL", "DEN", "DET", "GSW",
+    "HOU", "IND", "LAC", "LAL", "MEM", "MIA", "MIL", "MIN", "NOP", "NYK",
+    "OKC", "ORL", "PHI", "PHO", "POR", "SAC", "SAS", "TOR", "UTA", "WAS",
+]
+
+
+def _fmt(values, digits):
+    return [f"{value:.{digits}f}" for value in values]
+
+
+def synthetic_per_game(n_players, seed=0):
+    # Strings, like the scraped table, so the parsing/conversion cost is realistic
+    rng = np.random.default_rng(seed)
+    games = rng.integers(1, 83, n_players)
+    started = np.minimum(games, rng.integers(0, 83, n_players))
+    pts = rng.gamma(2.0, 5.0, n_players)
+    fg3 = rng.gamma(1.2, 0.8, n_players)
+    fg3a = fg3 * rng.uniform(2.2, 3.5, n_players)
+    fg2 = rng.gamma(2.0, 2.0, n_players)
+    fg2a = fg2 * rng.uniform(1.6, 2.4, n_players)
+    columns = {
+        # Every 50th player repeats the previous name, like a traded player's rows
+        "Player": [f"Player {i - (i % 50 == 1)}" for i in range(n_players)],
+        "Age": rng.integers(19, 40, n_players).astype(str),
+        "Team": rng.choice(TEAM_ABBREVIATIONS, n_players),
+        "Pos": rng.choice(["PG", "SG", "SF", "PF", "C"], n_players),
+        "G": games.astype(str),
+        "GS": started.astype(str),
+        "MP": _fmt(rng.uniform(5, 40, n_players), 1),
+        "FG": _fmt(fg3 + fg2, 1),
+        "FGA": _fmt(fg3a + fg2a, 1),
+        "FG%": _fmt(rng.uniform(0.35, 0.6, n_players), 3),
+        "3P": _fmt(fg3, 1),
+        "3PA": _fmt(fg3a, 1),
+        "3P%": _fmt(rng.uniform(0.2, 0.45, n_players), 3),
+        "2P": _fmt(fg2, 1),
+        "2PA": _fmt(fg2a, 1),
+        "2P%": _fmt(rng.uniform(0.4, 0.6, n_players), 3),
+        "eFG%": _fmt(rng.uniform(0.4, 0.65, n_players), 3),
+        "FT": _fmt(rng.gamma(1.5, 1.0, n_players), 1),
+        "FTA": _fmt(rng.gamma(1.5, 1.3, n_players), 1),
+        "FT%": _fmt(rng.uniform(0.5, 0.95, n_players), 3),
+        "ORB": _fmt(rng.gamma(1.2, 0.8, n_players), 1),
+        "DRB": _fmt(rng.gamma(2.0, 1.5, n_players), 1),
+        "TRB": _fmt(rng.gamma(2.0, 2.2, n_players), 1),
+        "AST": _fmt(rng.gamma(1.5, 1.8, n_players), 1),
+        "STL": _fmt(rng.gamma(2.0, 0.4, n_players), 1),
+        "BLK": _fmt(rng.gamma(1.2, 0.4, n_players), 1),
+        "TOV": _fmt(rng.gamma(2.0, 0.7, n_players), 1),
+        "PF": _fmt(rng.gamma(3.0, 0.6, n_players), 1),
+        "PTS": _fmt(pts, 1),
+        "Awards": [""] * n_players,
+    }
+    # A few blank shooting percentages, as for players who never attempted a three
+    blanks = rng.random(n_players) < 0.03
+    columns["3P%"] = ["" if blank else value for blank, value in zip(blanks, columns["3P%"])]
+    return pd.DataFrame(columns, columns=PER_GAME_COLUMNS)
+
+
+def synthetic_standings(seed=0):
+    rng = np.random.default_rng(seed)
+    wins = rng.integers(15, 65, len(TEAM_ABBREVIATIONS))
+    teams = [
+        {
+            'Team Name': abbreviation,
+            'Team Abbreviation': abbreviation,
+            'Wins': int(w),
+            'Losses': int(82 - w),
+            'Win-Loss Percentage': f"{w / 82:.3f}".lstrip('0'),
+        }
+        for abbreviation, w in zip(TEAM_ABBREVIATIONS, wins)
+    ]
+    teams = sorted(teams, key=lambda team: team['Wins'])
+    for i, team in enumerate(teams):
+        team['Rank'] = len(teams) - i
+    return teams
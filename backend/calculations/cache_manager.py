@@ -0,0 +1,257 @@
+import fnmatch
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks are only held within the process
+    fcntl = None
+
+# Every on-disk cache goes through here. Paths are resolved relative to the
+# package, writes land via temp file + rename, writers of the same key take an
+# flock so several gunicorn workers never interleave, each cache directory has a
+# byte budget enforced by evicting the least recently read files, and entries
+# can carry a TTL (the current season goes stale, past seasons never do).
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOCK_DIR_NAME = ".locks"
+DEFAULT_BUDGET = 256 * 1024 * 1024
+CURRENT_SEASON_TTL = 6 * 3600
+SEASON_START_MONTH = 10  # seasons are named by the year they end; they start in October
+FIRST_SEASON = 1947  # the BAA's first season; earlier years have no pages to fetch
+LAST_SEASON = None  # None: the season after the current one (the benchmarks raise it for synthetic seasons)
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+def backend_path(*parts):
+    return os.path.join(BACKEND_DIR, *parts)
+
+
+def current_season(now=None):
+    today = time.localtime(now)
+    return today.tm_year + 1 if today.tm_mon >= SEASON_START_MONTH else today.tm_year
+
+
+def season_year(year):
+    # Season years end up in file and lock names and upstream URLs, so only a
+    # plain integer year in range gets through ("2024" and 2024 are both fine)
+    if isinstance(year, bool) or not isinstance(year, (int, str)):
+        raise ValueError(f"Invalid season year {year!r}")
+    if isinstance(year, str):
+        if not (year.isascii() and year.isdigit()):
+            raise ValueError(f"Invalid season year {year!r}")
+        year = int(year)
+    last = current_season() + 1 if LAST_SEASON is None else LAST_SEASON
+    if not FIRST_SEASON <= year <= last:
+        raise ValueError(f"Season year {year} is outside {FIRST_SEASON}-{last}")
+    return year
+
+
+def season_ttl(year):
+    # None (never expires) for finished seasons, CURRENT_SEASON_TTL otherwise
+    try:
+        return None if int(year) < current_season() else CURRENT_SEASON_TTL
+    except (TypeError, ValueError):
+        return CURRENT_SEASON_TTL
+
+
+@contextmanager
+def file_lock(path):
+    # Exclusive across threads (a lock per path) and processes (flock on path + ".lock")
+    with _thread_locks_guard:
+        thread_lock = _thread_locks.setdefault(path, threading.Lock())
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@contextmanager
+def atomic_path(path):
+    # Yields a temp path to write to; it replaces `path` only if the block succeeds
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def atomic_write(path, content):
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, 'wb' if isinstance(content, bytes) else 'w') as file:
+            file.write(content)
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.writes = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+class FileCache:
+    def __init__(self, name, directory, budget_bytes=DEFAULT_BUDGET):
+        self.name = name
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+        self.lock_dir = os.path.join(directory, LOCK_DIR_NAME)
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def path(self, key):
+        return os.path.join(self.directory, key)
+
+    def lock(self, key):
+        return file_lock(os.path.join(self.lock_dir, key))
+
+    def _count(self, field, amount=1):
+        with self._lock:
+            setattr(self._stats, field, getattr(self._stats, field) + amount)
+
+    def is_fresh(self, key, ttl=None):
+        try:
+            written = os.stat(self.path(key)).st_mtime
+        except FileNotFoundError:
+            return False
+        return ttl is None or time.time() - written < ttl
+
+    def read(self, key, ttl=None, binary=False):
+        # Contents of a fresh entry, else None. Reading refreshes the entry's
+        # access time, which is what eviction orders by.
+        path = self.path(key)
+        try:
+            status = os.stat(path)
+            if ttl is not None and time.time() - status.st_mtime >= ttl:
+                self._count('expired')
+                self._count('misses')
+                return None
+            with open(path, 'rb' if binary else 'r') as file:
+                content = file.read()
+            os.utime(path, ns=(time.time_ns(), status.st_mtime_ns))
+        except FileNotFoundError:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return content
+
+    def read_json(self, key, ttl=None):
+        content = self.read(key, ttl)
+        return None if content is None else json.loads(content)
+
+    def write(self, key, content):
+        atomic_write(self.path(key), content)
+        self._count('writes')
+        self.evict(keep=key)
+
+    def write_json(self, key, data):
+        self.write(key, json.dumps(data))
+
+    def get_or_create_json(self, key, create, ttl=None):
+        # Only one thread or process builds a missing key; the rest wait and read its result
+        data = self.read_json(key, ttl)
+        if data is not None:
+            return data
+        with self.lock(key):
+            data = self.read_json(key, ttl)
+            if data is None:
+                data = create()
+                self.write_json(key, data)
+        return data
+
+    def keys(self, pattern='*'):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            entry.name for entry in os.scandir(self.directory)
+            if entry.is_file() and not entry.name.endswith(('.tmp', '.lock')) and fnmatch.fnmatch(entry.name, pattern)
+        )
+
+    def _entries(self):
+        entries = []
+        for key in self.keys():
+            try:
+                status = os.stat(self.path(key))
+            except FileNotFoundError:
+                continue
+            entries.append((status.st_atime, status.st_size, key))
+        return entries
+
+    def evict(self, keep=None):
+        # Least recently read entries go first until the directory fits its budget
+        if self.budget_bytes is None:
+            return
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.budget_bytes:
+            return
+        for _, size, key in sorted(entries):
+            if total <= self.budget_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass  # another worker evicted it first
+            total -= size
+            self._count('evictions')
+            self._count('evicted_bytes', size)
+
+    def stats(self):
+        entries = self._entries()
+        with self._lock:
+            stats = self._stats.as_dict()
+        stats.update({
+            'directory': self.directory,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'budget_bytes': self.budget_bytes,
+        })
+        return stats
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name, directory, budget_bytes=DEFAULT_BUDGET):
+    # One FileCache per directory, shared by everything in the process
+    directory = os.path.abspath(directory)
+    with _caches_lock:
+        if directory not in _caches:
+            _caches[directory] = FileCache(name, directory, budget_bytes)
+        return _caches[directory]
+
+
+def register_cache(key, cache):
+    # Caches that are not a FileCache directory (e.g. the game-log SQLite store)
+    # still report through stats(); they need a `name` and a stats() method
+    with _caches_lock:
+        _caches[key] = cache
+        return cache
+
+
+def stats():
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.name: cache.stats() for cache in caches}
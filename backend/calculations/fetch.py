@@ -0,0 +1,237 @@
+import hashlib
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from calculations.cache_manager import backend_path, get_cache
+from calculations.metrics import stage
+
+# One fetch layer for every upstream call: a pooled keep-alive session per host,
+# a per-host token bucket, exponential backoff with jitter on 429/5xx, and
+# ETag/Last-Modified revalidation for GETs so unchanged pages come back as a
+# cheap 304. Base URLs can be pointed at a local stand-in server for testing.
+BASKETBALL_REFERENCE_URL = os.environ.get("BASKETBALL_REFERENCE_URL", "https://www.basketball-reference.com")
+NBAAPI_URL = os.environ.get("NBAAPI_URL", "https://www.nbaapi.com/graphql/")
+
+HTTP_CACHE_DIR = backend_path("http_cache")
+HTTP_CACHE_BUDGET = 512 * 1024 * 1024
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# (requests per second, burst) per host; basketball-reference allows ~20 per minute
+HOST_RATES = {
+    'www.basketball-reference.com': (20 / 60, 2),
+    'www.nbaapi.com': (5, 5),
+    'stats.nba.com': (1, 1),  # called through nba_api, which has no limiter of its own
+}
+DEFAULT_RATE = (10, 10)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+TIMEOUT = 30
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        # Blocks until a token is available; returns how long it waited
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.not_modified = 0
+        self.throttled_seconds = 0.0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'not_modified': self.not_modified,
+            'throttled_seconds': round(self.throttled_seconds, 3),
+            'latency_avg_ms': round(1000 * self.latency_total / self.requests, 1) if self.requests else 0.0,
+            'latency_max_ms': round(1000 * self.latency_max, 1),
+        }
+
+
+class Fetcher:
+    def __init__(self, host_rates=None, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE,
+                 backoff_cap=BACKOFF_CAP, cache_dir=HTTP_CACHE_DIR, sleep=time.sleep):
+        self.host_rates = dict(HOST_RATES if host_rates is None else host_rates)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.cache = get_cache('http', cache_dir, HTTP_CACHE_BUDGET)
+        self.sleep = sleep
+        self._sessions = {}
+        self._buckets = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _host_state(self, host):
+        with self._lock:
+            if host not in self._sessions:
+                session = requests.Session()
+                session.headers.update({'User-Agent': USER_AGENT})
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[host] = session
+                self._buckets[host] = TokenBucket(*self.host_rates.get(host, DEFAULT_RATE))
+                self._stats[host] = HostStats()
+            return self._sessions[host], self._buckets[host], self._stats[host]
+
+    def _backoff(self, attempt, response):
+        # Full jitter, but never sooner than the server's Retry-After
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        return delay
+
+    def request(self, method, url, **kwargs):
+        host = urlsplit(url).netloc
+        session, bucket, stats = self._host_state(host)
+        kwargs.setdefault('timeout', TIMEOUT)
+
+        attempt = 0
+        while True:
+            waited = bucket.acquire()
+            start = time.perf_counter()
+            response, error = None, None
+            try:
+                with stage('upstream'):
+                    response = session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                stats.requests += 1
+                stats.throttled_seconds += waited
+                stats.latency_total += elapsed
+                stats.latency_max = max(stats.latency_max, elapsed)
+                failed = error is not None or response.status_code >= 400
+                if failed:
+                    stats.errors += 1
+
+            retryable = error is not None or response.status_code in RETRY_STATUSES
+            if not retryable or attempt >= self.max_retries:
+                if error is not None:
+                    raise error
+                return response
+
+            with self._lock:
+                stats.retries += 1
+            self.sleep(self._backoff(attempt, response))
+            attempt += 1
+
+    def _cache_keys(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return f"{key}.json", f"{key}.body"
+
+    def get(self, url, **kwargs):
+        meta_key, body_key = self._cache_keys(url)
+        meta = self.cache.read_json(meta_key) if self.cache.is_fresh(body_key) else None
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        response = self.request('GET', url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and meta:
+            body = self.cache.read(body_key, binary=True)
+            if body is not None:  # unless evicted since the request went out
+                host = urlsplit(url).netloc
+                with self._lock:
+                    self._stats[host].not_modified += 1
+                return _stored_response(url, meta, body)
+            headers.pop('If-None-Match', None)
+            headers.pop('If-Modified-Since', None)
+            return self.get(url, headers=headers, **kwargs)
+
+        if response.status_code == 200 and (response.headers.get('ETag') or response.headers.get('Last-Modified')):
+            self._store(url, response)
+        return response
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def _store(self, url, response):
+        meta_key, body_key = self._cache_keys(url)
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_type': response.headers.get('Content-Type'),
+            'encoding': response.encoding,
+        }
+        # Body first, then metadata, so a reader never pairs new validators with an old body
+        with self.cache.lock(body_key):
+            self.cache.write(body_key, response.content)
+            self.cache.write_json(meta_key, meta)
+
+    def stats(self):
+        with self._lock:
+            return {host: host_stats.as_dict() for host, host_stats in self._stats.items()}
+
+
+def _stored_response(url, meta, body):
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = body
+    response.encoding = meta.get('encoding')
+    if meta.get('content_type'):
+        response.headers['Content-Type'] = meta['content_type']
+    if meta.get('etag'):
+        response.headers['ETag'] = meta['etag']
+    response.headers['X-Revalidated'] = '304'
+    return response
+
+
+fetcher = Fetcher()
+
+
+def get(url, **kwargs):
+    return fetcher.get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    return fetcher.post(url, **kwargs)
+
+
+def stats():
+    return fetcher.stats()
@@ -0,0 +1,180 @@
+import ast
+import json
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from calculations.metrics import cache_lookup, stage
+from calculations.scoring import load_weights
+
+# MVP score formulas written over column names instead of row positions, e.g.
+#   0.28 * PTS + 0.12 * 3 * TRB + 0.21 * 60 * `eFG%` + 0.15 * (Wins + Rank)
+# Names are the season table's columns plus the standings' Wins and Rank;
+# columns that are not identifiers go in backticks. A formula is parsed once,
+# checked against a whitelist of syntax (numbers, names, arithmetic and the
+# functions below), compiled, and kept in an LRU of plans; evaluating a plan is
+# one numpy expression over whole columns.
+MAX_FORMULA_LENGTH = 500
+MAX_NODES = 200
+MAX_PLANS = 128
+
+FUNCTIONS = {
+    # name: (implementation, number of arguments)
+    'abs': (np.abs, 1),
+    'sqrt': (np.sqrt, 1),
+    'log': (np.log, 1),
+    'exp': (np.exp, 1),
+    'trunc': (np.trunc, 1),
+    'min': (np.minimum, 2),
+    'max': (np.maximum, 2),
+    'rank': (lambda values: pd.Series(values).rank(pct=True).to_numpy(), 1),  # percentile within the season
+}
+
+OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd)
+ALLOWED_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load, ast.Call) + OPERATORS
+
+# "legacy" is calculate_score itself (positional columns included); "tuned" is
+# the weights exported by modeling/weight_search.py. The rest are formula text.
+LEGACY = 'legacy'
+TUNED = 'tuned'
+NAMED_FORMULAS = {
+    # calculate_score's weights on the stats its variable names describe
+    'box': "0.15 * (Wins + Rank) + 0.28 * PTS + 0.12 * 3 * TRB + 0.16 * 4 * AST + 0.21 * 60 * `eFG%` + 0.08 * 20 * STL",
+    'scoring': "PTS + 0.5 * AST + 0.25 * TRB",
+    'winning': "0.5 * rank(PTS) + 0.25 * rank(`eFG%`) + Wins / 82",
+}
+
+BACKTICK = re.compile(r'`([^`]+)`')
+
+
+class FormulaError(ValueError):
+    pass
+
+
+class FormulaPlan:
+    def __init__(self, source, code, columns, calls):
+        self.source = source
+        self.code = code
+        self.columns = columns  # placeholder -> column name
+        self.calls = calls
+
+    def evaluate(self, table, length):
+        # table: column name -> numpy array of `length` values
+        missing = sorted(set(self.columns.values()) - set(table))
+        if missing:
+            raise FormulaError(f"Unknown column(s) {missing} in formula")
+        namespace = {placeholder: table[column] for placeholder, column in self.columns.items()}
+        namespace.update({name: FUNCTIONS[name][0] for name in self.calls})
+        try:
+            with np.errstate(all='ignore'):
+                score = eval(self.code, {'__builtins__': {}}, namespace)
+        except ArithmeticError as e:
+            raise FormulaError(f"Formula cannot be evaluated: {e}")
+        # Constant formulas still give one score per player; 0/0 and overflow score 0
+        score = np.broadcast_to(np.asarray(score, dtype=np.float64), (length,))
+        return np.where(np.isfinite(score), score, 0.0)
+
+
+def normalize(text):
+    return ' '.join(str(text).split())
+
+
+def compile_formula(text):
+    source = normalize(text)
+    if not source:
+        raise FormulaError("Empty formula")
+    if len(source) > MAX_FORMULA_LENGTH:
+        raise FormulaError(f"Formula is longer than {MAX_FORMULA_LENGTH} characters")
+
+    # `any column name` -> placeholder identifiers the parser accepts
+    columns = {}
+
+    def placeholder(match):
+        name = f"_col{len(columns)}"
+        columns[name] = match.group(1)
+        return f" {name} "
+
+    expression = BACKTICK.sub(placeholder, source).strip()
+    if '`' in expression:
+        raise FormulaError("Unmatched backtick in formula")
+    try:
+        tree = ast.parse(expression, mode='eval')
+    except SyntaxError as e:
+        raise FormulaError(f"Invalid formula syntax: {e.msg}")
+
+    nodes = list(ast.walk(tree))
+    if len(nodes) > MAX_NODES:
+        raise FormulaError(f"Formula has more than {MAX_NODES} terms")
+    calls = set()
+    callees = {id(node.func) for node in nodes if isinstance(node, ast.Call)}
+    for node in nodes:
+        if not isinstance(node, ALLOWED_NODES):
+            raise FormulaError(f"{type(node).__name__} is not allowed in a formula")
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise FormulaError(f"Only numbers are allowed as constants, not {node.value!r}")
+            node.value = float(node.value)  # no unbounded integer arithmetic
+        elif isinstance(node, ast.Call):
+            name = node.func.id if isinstance(node.func, ast.Name) else None
+            if name not in FUNCTIONS:
+                raise FormulaError(f"Unknown function {name or ast.dump(node.func)!r}; choose from {sorted(FUNCTIONS)}")
+            if node.keywords or len(node.args) != FUNCTIONS[name][1]:
+                raise FormulaError(f"{name}() takes {FUNCTIONS[name][1]} argument(s)")
+            calls.add(name)
+        elif isinstance(node, ast.Name) and id(node) not in callees and node.id not in columns:
+            if node.id in FUNCTIONS:
+                raise FormulaError(f"{node.id} is a function; call it as {node.id}(...)")
+            if node.id.startswith('_'):
+                raise FormulaError(f"Invalid column name {node.id!r}")
+            columns[node.id] = node.id
+
+    return FormulaPlan(source, compile(tree, '<formula>', 'eval'), columns, calls)
+
+
+class PlanCache:
+    # LRU of compiled plans keyed by normalized formula text
+    def __init__(self, max_entries=MAX_PLANS):
+        self.max_entries = max_entries
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text):
+        source = normalize(text)
+        with self._lock:
+            plan = self._plans.get(source)
+            if plan is not None:
+                self._plans.move_to_end(source)
+                self.hits += 1
+            else:
+                self.misses += 1
+        cache_lookup('formula', plan is not None)
+        if plan is None:
+            with stage('compile_formula'):
+                plan = compile_formula(source)
+            with self._lock:
+                self._plans[source] = plan
+                while len(self._plans) > self.max_entries:
+                    self._plans.popitem(last=False)
+        return plan
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._plans), 'max_entries': self.max_entries, 'hits': self.hits, 'misses': self.misses}
+
+
+plan_cache = PlanCache()
+
+
+def resolve(formula):
+    # ?formula= value -> (cache key text, plan or None, weights or None); blank or "legacy" is calculate_score
+    name = normalize(formula or LEGACY)
+    if name == LEGACY:
+        return LEGACY, None, None
+    if name == TUNED:
+        weights = load_weights()
+        return f"{TUNED} {json.dumps(weights, sort_keys=True)}", None, weights
+    plan = plan_cache.get(NAMED_FORMULAS.get(name, name))
+    return plan.source, plan, None
@@ -0,0 +1,238 @@
+import glob
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from calculations.cache_manager import backend_path, register_cache
+
+# All player game logs in one SQLite file, keyed by (season, player_id), instead
+# of one JSON file per player. A whole season comes back from one range scan, and
+# empty responses are remembered for NEGATIVE_TTL so they are retried eventually
+# rather than re-fetched on every run (or never again). Like the file caches it
+# reports through cache_manager.stats() and keeps to a byte budget, dropping the
+# least recently fetched entries first.
+STORE_FILE = backend_path("player_cache", "game_logs.sqlite")
+LEGACY_JSON_DIR = backend_path("player_cache")
+NEGATIVE_TTL = 7 * 24 * 3600
+DEFAULT_BUDGET = 512 * 1024 * 1024
+EVICT_TO = 0.9  # eviction frees down to this share of the budget, so it runs once per 10% written
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS game_logs (
+    season TEXT NOT NULL,
+    player_id INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (season, player_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS league_log_columns (
+    season TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    dtype TEXT NOT NULL,
+    data BLOB NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (season, position)
+) WITHOUT ROWID;
+"""
+
+
+class GameLogStore:
+    def __init__(self, path=STORE_FILE, negative_ttl=NEGATIVE_TTL, budget_bytes=DEFAULT_BUDGET):
+        self.name = 'game_logs'
+        self.path = path
+        self.negative_ttl = negative_ttl
+        self.budget_bytes = budget_bytes
+        self.evictions = 0
+        self._stored = None  # running payload total; recounted exactly only when it passes the budget
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def _connection(self):
+        # One connection per thread; WAL lets several processes read while one writes
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _fresh(self, games, fetched_at, now):
+        return games > 0 or now - fetched_at < self.negative_ttl
+
+    def get(self, player_id, season):
+        # (hit, records); an expired empty entry counts as a miss
+        row = self._connection().execute(
+            "SELECT payload, games, fetched_at FROM game_logs WHERE season = ? AND player_id = ?",
+            (str(season), int(player_id)),
+        ).fetchone()
+        if row is None or not self._fresh(row[1], row[2], time.time()):
+            return False, None
+        return True, json.loads(row[0])
+
+    def get_season(self, season):
+        # {player_id: records} for every fresh entry of the season, in one query
+        now = time.time()
+        rows = self._connection().execute(
+            "SELECT player_id, payload, games, fetched_at FROM game_logs WHERE season = ?",
+            (str(season),),
+        ).fetchall()
+        return {
+            player_id: json.loads(payload)
+            for player_id, payload, games, fetched_at in rows
+            if self._fresh(games, fetched_at, now)
+        }
+
+    def put(self, player_id, season, records):
+        self.put_many(season, {player_id: records})
+
+    def put_many(self, season, records_by_player, fetched_at=None):
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        rows = [
+            (str(season), int(player_id), json.dumps(records, separators=(',', ':')), len(records), fetched_at)
+            for player_id, records in records_by_player.items()
+        ]
+        with self._connection() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO game_logs (season, player_id, payload, games, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        self.evict(sum(len(row[2]) for row in rows))
+
+    def put_league_log(self, season, frame):
+        # A whole season's league game log, one blob per column: numeric columns as
+        # raw array bytes, everything else as a JSON list
+        fetched_at = time.time()
+        rows = []
+        for position, name in enumerate(frame.columns):
+            values = frame[name].to_numpy()
+            if values.dtype.kind in 'biuf':
+                rows.append((str(season), position, name, values.dtype.str, values.tobytes(), fetched_at))
+            else:
+                data = json.dumps([None if pd.isna(value) else value for value in values.tolist()])
+                rows.append((str(season), position, name, 'json', data.encode('utf-8'), fetched_at))
+        with self._connection() as connection:
+            connection.execute("DELETE FROM league_log_columns WHERE season = ?", (str(season),))
+            connection.executemany(
+                "INSERT INTO league_log_columns (season, position, name, dtype, data, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        self.evict(sum(len(row[4]) for row in rows))
+
+    def stored_bytes(self):
+        connection = self._connection()
+        logs = connection.execute("SELECT COALESCE(SUM(LENGTH(payload)), 0) FROM game_logs").fetchone()[0]
+        league = connection.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM league_log_columns").fetchone()[0]
+        return logs + league
+
+    def evict(self, added=0):
+        # Oldest fetches go first (player logs one by one, league logs a season at a
+        # time) until the stored payloads fit the budget; SQLite reuses the freed pages.
+        # Puts only add to a running total (replaced rows and other processes' writes
+        # are not in it), and the exact SUM scan runs once that total passes the budget
+        if self.budget_bytes is None:
+            return
+        with self._lock:
+            self._stored = self.stored_bytes() if self._stored is None else self._stored + added
+            if self._stored <= self.budget_bytes:
+                return
+            self._stored = self._evict(self.stored_bytes(), int(self.budget_bytes * EVICT_TO))
+
+    def _evict(self, total, target):
+        if total <= self.budget_bytes:
+            return total
+        connection = self._connection()
+        entries = connection.execute(
+            "SELECT fetched_at, 'player', season, player_id, LENGTH(payload) FROM game_logs "
+            "UNION ALL SELECT MIN(fetched_at), 'league', season, NULL, SUM(LENGTH(data)) FROM league_log_columns GROUP BY season "
+            "ORDER BY 1"
+        ).fetchall()
+        with connection:
+            for _, kind, season, player_id, size in entries:
+                if total <= target:
+                    break
+                if kind == 'player':
+                    connection.execute("DELETE FROM game_logs WHERE season = ? AND player_id = ?", (season, player_id))
+                else:
+                    connection.execute("DELETE FROM league_log_columns WHERE season = ?", (season,))
+                total -= size
+                self.evictions += 1
+        return total
+
+    def get_league_log(self, season, max_age=None):
+        # DataFrame, or None when the season is missing or older than max_age seconds
+        rows = self._connection().execute(
+            "SELECT name, dtype, data, fetched_at FROM league_log_columns WHERE season = ? ORDER BY position",
+            (str(season),),
+        ).fetchall()
+        if not rows or (max_age is not None and time.time() - rows[0][3] > max_age):
+            return None
+        columns = {}
+        for name, dtype, data, _ in rows:
+            if dtype == 'json':
+                columns[name] = json.loads(data.decode('utf-8'))
+            else:
+                columns[name] = np.frombuffer(data, dtype=np.dtype(dtype))
+        return pd.DataFrame(columns)
+
+    def stats(self):
+        total, empty = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(games = 0), 0) FROM game_logs"
+        ).fetchone()
+        league_seasons = self._connection().execute(
+            "SELECT COUNT(DISTINCT season) FROM league_log_columns"
+        ).fetchone()[0]
+        return {
+            'directory': os.path.dirname(self.path),
+            'entries': total,
+            'empty_entries': empty,
+            'league_seasons': league_seasons,
+            'bytes': self.stored_bytes(),
+            'file_bytes': os.path.getsize(self.path),
+            'budget_bytes': self.budget_bytes,
+            'evictions': self.evictions,
+        }
+
+    def import_json_dir(self, directory=LEGACY_JSON_DIR):
+        # Migrate {player_id}_{season}.json files; their mtime becomes fetched_at
+        imported = 0
+        for path in glob.glob(os.path.join(directory, "*_*.json")):
+            player_id, season = os.path.basename(path)[:-len(".json")].split('_', 1)
+            with open(path, 'r') as file:
+                records = json.load(file)
+            self.put_many(season, {int(player_id): records}, fetched_at=os.path.getmtime(path))
+            imported += 1
+        return imported
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = register_cache(STORE_FILE, GameLogStore())
+        return _store
+
+
+if __name__ == '__main__':
+    # Usage: python -m calculations.game_log_store import [directory]
+    if len(sys.argv) < 2 or sys.argv[1] != 'import':
+        print("Usage: python -m calculations.game_log_store import [directory]")
+        sys.exit(1)
+    directory = sys.argv[2] if len(sys.argv) > 2 else LEGACY_JSON_DIR
+    count = get_store().import_json_dir(directory)
+    print(f"Imported {count} game logs into {STORE_FILE}: {get_store().stats()}")
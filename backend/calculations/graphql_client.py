@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from calculations import fetch
+from calculations.cache_manager import get_cache, season_ttl
+
+# Packs many nbaapi selections into one aliased GraphQL query
+# (q0: team(...) {...} q1: team(...) {...}), sends batches concurrently under the
+# fetch layer's per-host rate limit, and keeps each selection's result on disk
+# keyed by the hash of its query text.
+GRAPHQL_CACHE_DIR = os.path.join(fetch.HTTP_CACHE_DIR, "graphql")
+BATCH_SIZE = 40
+PLAYER_BATCH_SIZE = 8  # whole-league player lists are large; fewer per request
+MAX_WORKERS = 4
+
+TEAM_FIELDS = ["season", "teamName", "coaches", "topWs", "wins", "playoffs"]
+PLAYER_ADVANCED_FIELDS = [
+    "playerName", "position", "team", "games", "per", "usagePercent", "offensiveWs",
+    "defensiveWs", "winShares", "offensiveBox", "defensiveBox", "vorp",
+]
+PLAYER_TOTALS_FIELDS = [
+    "playerName", "position", "team", "games", "points", "assists", "totalRb",
+    "steals", "blocks", "turnovers", "effectFgPercent",
+]
+
+
+def format_arguments(arguments):
+    # {"teamAbbr": "SAC", "season": 2001} -> teamAbbr: "SAC", season: 2001
+    parts = []
+    for name, value in arguments.items():
+        literal = json.dumps(value) if isinstance(value, str) else str(int(value))
+        parts.append(f"{name}: {literal}")
+    return ", ".join(parts)
+
+
+def selection_text(field, arguments, fields):
+    return f"{field}({format_arguments(arguments)}) {{ {' '.join(fields)} }}"
+
+
+class GraphQLClient:
+    def __init__(self, url=None, batch_size=BATCH_SIZE, max_workers=MAX_WORKERS,
+                 cache_dir=GRAPHQL_CACHE_DIR, post=None):
+        self.url = url or fetch.NBAAPI_URL
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.cache = get_cache('graphql', cache_dir)
+        self.post = post or fetch.post
+        self.requests_sent = 0
+
+    def _cache_key(self, text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest() + ".json"
+
+    def _read_cache(self, text, ttl=None):
+        content = self.cache.read(self._cache_key(text), ttl)
+        if content is None:
+            return False, None
+        return True, json.loads(content)
+
+    def _write_cache(self, text, result):
+        self.cache.write_json(self._cache_key(text), result)
+
+    def _send_batch(self, texts):
+        query = "query Batch {\n" + "\n".join(f"  q{i}: {text}" for i, text in enumerate(texts)) + "\n}"
+        response = self.post(self.url, headers={"Content-Type": "application/json"}, json={"query": query, "variables": {}})
+        self.requests_sent += 1
+        if response.status_code != 200:
+            print(f"Error: {response.status_code}")
+            print(response.text)  # Print error message if available
+            return [None] * len(texts)
+
+        body = response.json()
+        errors = body.get('errors') or []
+        for error in errors:
+            print(f"GraphQL error: {error.get('message', error)}")
+        data = body.get('data') or {}
+
+        # A batch with errors may hold partial or transient nulls, so none of it is
+        # cached; otherwise only real results are, so a null is asked for again next run
+        results = []
+        for i, text in enumerate(texts):
+            result = data.get(f"q{i}")
+            if result is not None and not errors:
+                self._write_cache(text, result)
+            results.append(result)
+        return results
+
+    def query_many(self, selections, use_cache=True, batch_size=None):
+        # selections: [(field, arguments, fields), ...] -> results in the same order
+        texts = [selection_text(*selection) for selection in selections]
+        # Results for the season in progress go stale; finished seasons never change
+        ttls = {text: season_ttl(arguments['season']) if 'season' in arguments else None
+                for text, (_, arguments, _) in zip(texts, selections)}
+        results = {}
+        pending = []
+        for text in dict.fromkeys(texts):
+            hit, result = self._read_cache(text, ttls[text]) if use_cache else (False, None)
+            if hit:
+                results[text] = result
+            else:
+                pending.append(text)
+
+        batch_size = batch_size or self.batch_size
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+                for batch, batch_results in zip(batches, executor.map(self._send_batch, batches)):
+                    results.update(zip(batch, batch_results))
+
+        return [results.get(text) for text in texts]
+
+    def fetch_teams(self, team_abbrs, seasons, use_cache=True):
+        # {(team_abbr, season): team data} for every combination
+        keys = [(team_abbr, season) for season in seasons for team_abbr in team_abbrs]
+        selections = [
+            ("team", {"teamAbbr": team_abbr, "season": int(season), "ordering": "-ws"}, TEAM_FIELDS)
+            for team_abbr, season in keys
+        ]
+        return dict(zip(keys, self.query_many(selections, use_cache)))
+
+    def fetch_player_seasons(self, seasons, use_cache=True):
+        # {season: (advanced records, totals records)}, both tagged with their season
+        selections = []
+        for season in seasons:
+            selections.append(("playerAdvanced", {"season": int(season)}, PLAYER_ADVANCED_FIELDS))
+            selections.append(("playerTotals", {"season": int(season)}, PLAYER_TOTALS_FIELDS))
+        results = self.query_many(selections, use_cache, PLAYER_BATCH_SIZE)
+
+        player_seasons = {}
+        for i, season in enumerate(seasons):
+            advanced, totals = results[2 * i] or [], results[2 * i + 1] or []
+            for record in advanced + totals:
+                record['season'] = season
+            player_seasons[season] = (advanced, totals)
+        return player_seasons
+
+
+client = GraphQLClient()
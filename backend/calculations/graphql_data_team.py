@@ -1,49 +1,16 @@
-import requests
-
-# Define the API URL
-url = "https://www.nbaapi.com/graphql/"
-
-# Define the headers
-headers = {
-    "Content-Type": "application/json"
-}
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from calculations.graphql_client import client
 
 # Function to fetch data for a specific year and team
 def fetch_team_data(team_abbr, season):
-    # Define the GraphQL query with variables
-    query = """
-    query TEAM($teamAbbr: String!, $season: Int!) {
-      team(teamAbbr: $teamAbbr, season: $season, ordering: "-ws") {
-        season
-        teamName
-        coaches
-        topWs
-        wins
-        playoffs
-      }
-    }
-    """
-    
-    # Define the variables
-    variables = {
-        "teamAbbr": team_abbr,
-        "season": season
-    }
-    
-    # Create the payload
-    payload = {
-        "query": query,
-        "variables": variables
-    }
-    
-    # Make the POST request
-    response = requests.post(url, headers=headers, json=payload)
-    
-    # Check if the request was successful and return the response
-    if response.status_code == 200:
-        return response.json()  # Return the parsed JSON response
-    else:
-        print(f"Error: {response.status_code}")
-        print(response.text)  # Print error message if available
+    # Same response shape as the single-team query used to return
+    result = client.fetch_teams([team_abbr], [season])[(team_abbr, season)]
+    if result is None:
         return None
+    return {"data": {"team": result}}
 
+# Function to fetch every (team, season) combination in a handful of batched requests
+def fetch_all_team_data(team_abbrs, seasons):
+    return client.fetch_teams(team_abbrs, seasons)
@@ -0,0 +1,141 @@
+import codecs
+from html.parser import HTMLParser
+
+# Streams a page through the stdlib tokenizer and keeps only the rows of the
+# requested <table id=...>, instead of building a BeautifulSoup tree of the whole
+# document. Tables basketball-reference ships inside HTML comments are found too.
+# Parsing stops as soon as every requested table has been closed.
+CHUNK_SIZE = 64 * 1024
+
+
+class TableRow:
+    __slots__ = ('classes', 'th', 'td', 'td_links', 'stats', 'links')
+
+    def __init__(self, classes):
+        self.classes = classes
+        self.th = []        # header cell texts
+        self.td = []        # data cell texts, in order
+        self.td_links = []  # first href inside each td cell (or None)
+        self.stats = {}     # data-stat -> text, for td cells
+        self.links = []     # (href, text) of every <a> in the row
+
+
+class _TableParser(HTMLParser):
+    def __init__(self, table_ids):
+        super().__init__(convert_charrefs=True)
+        self.wanted = set(table_ids)
+        self.tables = {}
+        self.table_id = None
+        self.depth = 0
+        self.row = None
+        self.cell = None
+        self.link = None
+
+    @property
+    def done(self):
+        return self.table_id is None and self.wanted.issubset(self.tables)
+
+    def handle_starttag(self, tag, attrs):
+        if self.table_id is None:
+            if tag == 'table':
+                table_id = dict(attrs).get('id')
+                if table_id in self.wanted and table_id not in self.tables:
+                    self.table_id = table_id
+                    self.depth = 1
+                    self.tables[table_id] = []
+            return
+
+        if tag == 'table':
+            self.depth += 1
+        elif tag == 'tr' and self.depth == 1:
+            self.row = TableRow((dict(attrs).get('class') or '').split())
+        elif tag in ('td', 'th') and self.row is not None:
+            self.cell = {'tag': tag, 'stat': dict(attrs).get('data-stat'), 'text': [], 'href': None}
+        elif tag == 'a' and self.row is not None:
+            self.link = [dict(attrs).get('href'), []]
+            if self.cell is not None and self.cell['href'] is None:
+                self.cell['href'] = self.link[0]
+
+    def handle_endtag(self, tag):
+        if self.table_id is None:
+            return
+
+        if tag == 'a' and self.link is not None:
+            self.row.links.append((self.link[0], ''.join(self.link[1])))
+            self.link = None
+        elif tag in ('td', 'th') and self.cell is not None:
+            text = ''.join(self.cell['text'])
+            if self.cell['tag'] == 'th':
+                self.row.th.append(text)
+            else:
+                self.row.td.append(text)
+                self.row.td_links.append(self.cell['href'])
+                if self.cell['stat']:
+                    self.row.stats[self.cell['stat']] = text
+            self.cell = None
+        elif tag == 'tr' and self.row is not None:
+            self.tables[self.table_id].append(self.row)
+            self.row = None
+        elif tag == 'table':
+            self.depth -= 1
+            if self.depth == 0:
+                self.table_id = None
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.cell['text'].append(data)
+        if self.link is not None:
+            self.link[1].append(data)
+
+    def handle_comment(self, data):
+        # Secondary tables are commented out in the page source
+        if self.table_id is None and any(f'id="{table_id}"' in data for table_id in self.wanted - set(self.tables)):
+            nested = _TableParser(self.wanted - set(self.tables))
+            nested.feed(data)
+            nested.close()
+            self.tables.update(nested.tables)
+
+
+def iter_chunks(html, chunk_size=CHUNK_SIZE):
+    if isinstance(html, str):
+        for start in range(0, len(html), chunk_size):
+            yield html[start:start + chunk_size]
+    else:
+        # Incremental decoding, so a character split across two chunks survives
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        for chunk in html:
+            yield decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        yield decoder.decode(b'', final=True)
+
+
+def extract_tables(html, table_ids):
+    # html: a string or an iterable of str/bytes chunks -> {table_id: [TableRow, ...]}
+    parser = _TableParser(table_ids)
+    for chunk in iter_chunks(html):
+        parser.feed(chunk)
+        if parser.done:
+            break
+    return parser.tables
+
+
+def extract_table(html, table_id):
+    return extract_tables(html, [table_id]).get(table_id)
+
+
+def table_columns(rows):
+    # First row's <th> cells (minus the rank header) name the columns; every row
+    # with <td> cells becomes one entry per column. None when the layout differs.
+    if not rows or not rows[0].th:
+        return None
+    header = rows[0].th[1:]
+    columns = {name: [] for name in header}
+    if len(columns) != len(header):
+        return None
+    for row in rows[1:]:
+        if not row.td:
+            continue
+        if len(row.td) != len(header):
+            return None
+        for name, value in zip(header, row.td):
+            columns[name].append(value)
+    return columns
@@ -0,0 +1,152 @@
+import argparse
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from calculations.season_store import get_season_table
+from calculations.mvp_calculations import season_label
+from calculations.cache_manager import atomic_path, backend_path, file_lock, current_season
+
+# league_avgs.csv from the local per-game season tables instead of one nba_api
+# call per season: every season's players are laid out as one row of a
+# (stat, season, player) array, and each top-N mean comes from one partial
+# selection (np.partition) along the player axis, for all seasons and stats at once.
+AVERAGES_FILE = backend_path("data", "league_avgs.csv")
+TOP_N = (20,)
+
+# Output name -> per-game column of the season table ("eFG%" is recomputed from FG, 3P and FGA)
+STAT_COLUMNS = {
+    'PPG': 'PTS',
+    'APG': 'AST',
+    'RPG': 'TRB',
+    'SPG': 'STL',
+    'BPG': 'BLK',
+    'eFG%': None,
+}
+
+
+EFG_COLUMNS = ['FG', '3P', 'FGA']
+
+
+def source_columns(stats):
+    columns = []
+    for name, column in stats.items():
+        columns.extend(EFG_COLUMNS if column is None else [column])
+    return list(dict.fromkeys(columns))
+
+
+def season_players(year, columns):
+    # One row per player: the first row is the full-season (TOT/2TM) line for traded players
+    data = get_season_table(year)
+    data = data[data['Player'].astype(str) != 'League Average']
+    data = data.drop_duplicates('Player', keep='first')
+    players = {'Season': season_label(year)}
+    for name in columns:
+        players[name] = pd.to_numeric(data[name], errors='coerce').to_numpy()
+    return pd.DataFrame(players)
+
+
+def league_player_table(years, stats=None):
+    columns = source_columns(STAT_COLUMNS if stats is None else stats)
+    return pd.concat([season_players(year, columns) for year in years], ignore_index=True)
+
+
+def output_columns(stats, top_n):
+    return (['Season'] + [f'League Average {name}' for name in stats]
+            + [f'Top {n} {name} Avg' for n in top_n for name in stats])
+
+
+def add_efg(players):
+    fga = players['FGA'].to_numpy(dtype=float)
+    made = players['FG'].to_numpy(dtype=float) + 0.5 * players['3P'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        players['eFG%'] = np.where(fga > 0, made / fga, 0.0)  # 0 for no attempts, as before
+    return players
+
+
+def season_matrix(players, columns):
+    # (stat, season, player) array, padded with NaN, plus the season labels in row order
+    codes, seasons = pd.factorize(players['Season'], sort=True)
+    position = pd.Series(codes).groupby(codes).cumcount().to_numpy()
+    values = np.full((len(columns), len(seasons), position.max() + 1 if len(position) else 0), np.nan)
+    values[:, codes, position] = players[columns].to_numpy(dtype=float).T
+    return values, list(seasons)
+
+
+def top_n_means(values, n):
+    # Mean of each (stat, season) row's n largest values, by partial selection
+    filled = np.where(np.isnan(values), -np.inf, values)
+    n = min(n, filled.shape[-1])
+    top = np.partition(filled, -n, axis=-1)[..., -n:]
+    top = np.where(np.isinf(top), np.nan, top)
+    with np.errstate(invalid='ignore'):
+        return np.nanmean(top, axis=-1)
+
+
+def league_averages(players, top_n=TOP_N, stats=None):
+    # Season, League Average <stat>..., Top <n> <stat> Avg... for every season in `players`
+    stats = dict(STAT_COLUMNS if stats is None else stats)
+    if None in stats.values():
+        players = add_efg(players.copy())
+    columns = [column or 'eFG%' for column in stats.values()]
+
+    values, seasons = season_matrix(players, columns)
+    with np.errstate(invalid='ignore'):
+        means = np.nanmean(values, axis=-1)
+
+    result = {'Season': seasons}
+    for i, name in enumerate(stats):
+        result[f'League Average {name}'] = means[i]
+    for n in top_n:
+        tops = top_n_means(values, n)
+        for i, name in enumerate(stats):
+            result[f'Top {n} {name} Avg'] = tops[i]
+    return pd.DataFrame(result)
+
+
+def season_year(label):
+    # "2022-23" -> 2023
+    return int(str(label)[:4]) + 1
+
+
+def update_averages_file(years, path=AVERAGES_FILE, top_n=TOP_N, stats=None, full=False):
+    # Computes only the seasons the file is missing (plus the season in progress) and merges them in
+    stats = dict(STAT_COLUMNS if stats is None else stats)
+    with file_lock(path):
+        existing = pd.read_csv(path) if os.path.exists(path) and not full else None
+        if existing is not None and list(existing.columns) != output_columns(stats, top_n):
+            existing = None  # different stats or top-N sizes: rebuild every season
+        have = set() if existing is None else {season_year(label) for label in existing['Season']}
+        wanted = [year for year in years if year not in have or year >= current_season()]
+        if not wanted:
+            return existing
+
+        new_rows = league_averages(league_player_table(wanted, stats), top_n, stats)
+        if existing is not None:
+            existing = existing[~existing['Season'].isin(new_rows['Season'])]
+            new_rows = pd.concat([existing, new_rows], ignore_index=True)
+        averages = new_rows.sort_values('Season', kind='stable').reset_index(drop=True)
+
+        with atomic_path(path) as tmp_path:
+            averages.to_csv(tmp_path, index=False)
+        return averages
+
+
+if __name__ == '__main__':
+    # Usage: python -m calculations.league_averages 1999 2024 [--top 20,10] [--extra TOV,MP] [--full]
+    parser = argparse.ArgumentParser(description="Rebuild league_avgs.csv from the local season store.")
+    parser.add_argument('first', type=int, help="first season (end year, 1999 = 1998-99)")
+    parser.add_argument('last', type=int, help="last season, inclusive")
+    parser.add_argument('--top', default=','.join(map(str, TOP_N)), help="comma-separated top-N sizes")
+    parser.add_argument('--extra', default='', help="more per-game columns to average, e.g. TOV,MP")
+    parser.add_argument('--output', default=AVERAGES_FILE)
+    parser.add_argument('--full', action='store_true', help="recompute every season")
+    args = parser.parse_args()
+
+    stats = dict(STAT_COLUMNS)
+    stats.update({name: name for name in args.extra.split(',') if name})
+    top_n = [int(n) for n in args.top.split(',') if n]
+    averages = update_averages_file(range(args.first, args.last + 1), args.output, top_n, stats, args.full)
+    print(averages)
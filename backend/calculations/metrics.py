@@ -0,0 +1,182 @@
+import bisect
+import contextvars
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Hot-path instrumentation: stage() times a block into a process-wide histogram
+# and into the current request's timing list (rendered as a Server-Timing
+# header), cache_lookup() counts hits and misses, and render() writes everything
+# in the Prometheus text format for /metrics. SamplingProfiler is the opt-in
+# per-request profiler, enabled with PROFILING_ENV=1 on the server.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROFILING_ENV = "MVP_PROFILING"
+PROFILE_INTERVAL = 0.005
+
+METRICS = {
+    'mvp_stage_seconds': ('histogram', "Time spent in each pipeline stage"),
+    'mvp_request_seconds': ('histogram', "HTTP request latency by endpoint and status"),
+    'mvp_cache_requests_total': ('counter', "Cache lookups by cache and result"),
+}
+
+_timings = contextvars.ContextVar('timings', default=None)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in METRICS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == 'counter':
+                    for (metric, labels), value in sorted(self.counters.items()):
+                        if metric == name:
+                            lines.append(f"{name}{format_labels(labels)} {value}")
+                    continue
+                for (metric, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(self.buckets_of(histogram), histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{format_labels(labels + (('le', bound),))} {cumulative}")
+                    lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def buckets_of(histogram):
+        return [str(bound) for bound in histogram.buckets] + ['+Inf']
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+
+registry = Registry()
+
+
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        registry.observe('mvp_stage_seconds', elapsed, stage=name)
+        timings = _timings.get()
+        if timings is not None:
+            timings.append((name, elapsed))
+
+
+def cache_lookup(cache, hit):
+    registry.inc('mvp_cache_requests_total', cache=cache, result='hit' if hit else 'miss')
+    timings = _timings.get()
+    if timings is not None:
+        timings.append((f"{cache}-{'hit' if hit else 'miss'}", None))
+    return hit
+
+
+def begin_request():
+    # Stages recorded on this context (and on contexts copied from it) land in the returned list
+    timings = []
+    return _timings.set(timings), timings
+
+
+def end_request(token):
+    _timings.reset(token)
+
+
+def server_timing(timings, total=None):
+    # [(stage, seconds or None), ...] -> "load;dur=12.1, filter;dur=0.4, result-hit"
+    durations = {}
+    for name, elapsed in timings:
+        if elapsed is None:
+            durations.setdefault(name, None)
+        else:
+            durations[name] = (durations.get(name) or 0.0) + elapsed
+    if total is not None:
+        durations['total'] = total
+    return ', '.join(
+        name if elapsed is None else f"{name};dur={elapsed * 1000:.1f}"
+        for name, elapsed in durations.items()
+    )
+
+
+def profiling_enabled():
+    return os.environ.get(PROFILING_ENV) == '1'
+
+
+class SamplingProfiler:
+    # Samples one thread's stack every `interval` seconds from a background thread
+    # and reports collapsed stacks ("outer;inner;leaf count"), flame-graph ready
+
+    def __init__(self, thread_id=None, interval=PROFILE_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self
+
+    def collapsed(self):
+        return '\n'.join(f"{stack} {count}" for stack, count in self.samples.most_common()) + '\n'
+
+
+def render():
+    return registry.render()
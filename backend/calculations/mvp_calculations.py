@@ -1,29 +1,130 @@
-import requests
+import csv
+import os
+import threading
+import unicodedata
 from bs4 import BeautifulSoup
+from calculations import fetch
+from calculations.html_tables import extract_table
+from calculations.cache_manager import atomic_path, backend_path
+from calculations.metrics import cache_lookup, stage
 
-def get_mvps(given_year):
-    my_hash = {}
-    url_player = "https://www.basketball-reference.com/awards/mvp.html"
-    response_player = requests.get(url_player)
+# Year -> MVP, read from a local file instead of scraping awards/mvp.html per
+# request, and re-read whenever the file changes (the refresh below runs in its
+# own process, so workers notice it by the file's mtime). Years are the season's end year ("2023" is 2022-23), names are plain
+# ASCII like the mvp_winners dict in EDA.ipynb. Refresh with:
+#   python -m calculations.mvp_calculations
+MVP_URL = fetch.BASKETBALL_REFERENCE_URL + "/awards/mvp.html"
+MVP_TABLE_ID = "mvp_NBA"
+MVP_FILE = backend_path("data", "mvp_winners.csv")
+
+_mvp_index = {'mtime': None, 'data': None}
+_index_lock = threading.Lock()
+
+
+def normalize_name(name):
+    # "Nikola Jokić" -> "Nikola Jokic"; also drops basketball-reference's Hall of Fame "*"
+    if name is None:
+        return None
+    name = unicodedata.normalize('NFKD', str(name))
+    return ''.join(char for char in name if not unicodedata.combining(char)).replace('*', '').strip()
+
+
+def season_label(year):
+    # 2023 -> "2022-23", the season strings used in the modeling datasets
+    year = int(year)
+    return f"{year - 1}-{str(year)[-2:]}"
+
+
+def fetch_mvp_history():
+    response_player = fetch.get(MVP_URL)
+    response_player.raise_for_status()
     response_player.encoding = 'utf-8'
 
-    soup = BeautifulSoup(response_player.text, 'html.parser')
-    nba_winners = soup.find('table', {'id': 'mvp_NBA'})
+    return parse_mvp_html(response_player.text)
+
+
+def parse_mvp_html(html):
+    # Only the mvp_NBA table is materialized; other layouts fall back to BeautifulSoup
+    rows = extract_table(html, MVP_TABLE_ID)
+    if not rows:
+        return _parse_mvp_soup(html)
+
+    my_hash = {}
+    for row in rows[1:]:
+        if len(row.td) > 1 and row.td_links[0]:
+            year = row.td_links[0].split('/')[-1].split('_')[1].split('.')[0]
+            my_hash[year] = normalize_name(row.td[1].strip())
+    return my_hash
+
+
+def _parse_mvp_soup(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    nba_winners = soup.find('table', {'id': MVP_TABLE_ID})
     rows = nba_winners.find_all('tr')
 
+    my_hash = {}
     for row in rows[1:]:
         columns = row.find_all('td')
         if len(columns) > 0:
             year_link = columns[0].find('a')['href']
             year = year_link.split('/')[-1].split('_')[1].split('.')[0]
             player = columns[1].text.strip()
-            my_hash[year] = player
+            my_hash[year] = normalize_name(player)
+    return my_hash
+
+
+def load_mvp_index():
+    with _index_lock:
+        mtime = os.stat(MVP_FILE).st_mtime_ns
+        if _mvp_index['mtime'] != mtime:
+            with open(MVP_FILE, 'r', newline='') as file:
+                _mvp_index['data'] = {row['Year']: row['Player'] for row in csv.DictReader(file)}
+            _mvp_index['mtime'] = mtime
+        return _mvp_index['data']
+
+
+def mvp_index_version():
+    # Changes whenever refresh_mvp_index rewrites the award file
+    try:
+        return os.stat(MVP_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def refresh_mvp_index():
+    # Re-scrape the award history and rewrite the local file
+    my_hash = fetch_mvp_history()
+    with atomic_path(MVP_FILE) as tmp_file:
+        with open(tmp_file, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['Year', 'Season', 'Player'])
+            for year in sorted(my_hash):
+                writer.writerow([year, season_label(year), my_hash[year]])
+
+    return load_mvp_index()
 
-    # # Debug print
-    # print("MVP Hash:", my_hash)
+
+def get_all_mvps():
+    # Every year at once, for the multi-year pipelines
+    return dict(load_mvp_index())
+
+
+def get_mvps_by_season():
+    # Same keys as the EDA.ipynb mvp_winners dict ("2022-23": "Joel Embiid")
+    return {season_label(year): player for year, player in load_mvp_index().items()}
+
+
+def get_mvps(given_year):
+    with stage('mvp_lookup'):
+        my_hash = load_mvp_index()
 
     # Handle missing year
-    if str(given_year) not in my_hash:
+    if not cache_lookup('mvp_index', str(given_year) in my_hash):
         raise KeyError(f"MVP data for year {given_year} is not available.")
 
     return my_hash[str(given_year)]
+
+
+if __name__ == '__main__':
+    index = refresh_mvp_index()
+    print(f"Stored {len(index)} MVP winners in {MVP_FILE}")
@@ -0,0 +1,113 @@
+import json
+import threading
+import numpy as np
+import pandas as pd
+from calculations.mvp_calculations import get_all_mvps, normalize_name
+from calculations.cache_manager import backend_path
+from calculations.metrics import stage
+from calculations import shared_tables
+
+# Serves the logistic regression trained by modeling/train.py (--export). The
+# artifact is plain JSON (coefficients, intercept and the StandardScaler's mean
+# and scale), so scoring is one standardize + matrix multiply + sigmoid in numpy
+# and the web workers never import sklearn. The model is loaded once per
+# worker; the player-season table is the memory-mapped shared copy when one is
+# published (calculations/shared_tables.py), else the CSV, read once.
+MODEL_FILE = backend_path("data", "mvp_model.json")
+MODEL_FORMAT = 1
+
+_model = None
+_players = None
+_load_lock = threading.Lock()
+
+
+class MvpModel:
+    def __init__(self, artifact):
+        if artifact.get('format') != MODEL_FORMAT:
+            raise RuntimeError(f"Unsupported model format {artifact.get('format')!r}, expected {MODEL_FORMAT}")
+        self.version = artifact['version']
+        self.features = list(artifact['features'])
+        self.coef = np.asarray(artifact['coef'], dtype=np.float64)
+        self.intercept = float(artifact['intercept'])
+        self.mean = np.asarray(artifact['scaler_mean'], dtype=np.float64)
+        self.scale = np.asarray(artifact['scaler_scale'], dtype=np.float64)
+
+    def predict_proba(self, X):
+        # P(MVP) for every row of X (columns in self.features order)
+        logits = ((np.asarray(X, dtype=np.float64) - self.mean) / self.scale) @ self.coef + self.intercept
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def describe(self):
+        return {'version': self.version, 'features': self.features}
+
+
+def load_model(path=MODEL_FILE):
+    global _model
+    with _load_lock:
+        if _model is None:
+            try:
+                with open(path, 'r') as file:
+                    _model = MvpModel(json.load(file))
+            except FileNotFoundError:
+                raise RuntimeError(f"No model artifact at {path}; run python modeling/train.py --export")
+        return _model
+
+
+def load_players(year=None):
+    global _players
+    shared = shared_tables.table('players')
+    if shared is not None:
+        return shared.frame(year=year)
+
+    with _load_lock:
+        if _players is None:
+            _players = shared_tables.players_frame()
+        players = _players
+    if players is None:
+        raise RuntimeError(f"No player-season table: {shared_tables.PLAYERS_FILE} is missing and no shared "
+                           f"tables are published; run python -m calculations.shared_tables publish")
+    return players if year is None else players[players['Year'] == int(year)]
+
+
+def reset():
+    # Drop the loaded model and table; the next request reloads them
+    global _model, _players
+    with _load_lock:
+        _model = None
+        _players = None
+
+
+def predict_rows(players, model=None):
+    model = model or load_model()
+    X = players[model.features].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    with stage('predict'):
+        probabilities = model.predict_proba(X)
+
+    mvps = get_all_mvps()
+    years = players['Year'].to_numpy()
+    names = players['playerName'].astype(str).tolist()
+    order = np.lexsort((-np.nan_to_num(probabilities, nan=-1.0), years))
+    return [
+        {
+            'Year': int(years[i]),
+            'Player': names[i],
+            'MVP Probability': None if np.isnan(probabilities[i]) else round(float(probabilities[i]), 4),
+            'MVP': normalize_name(names[i]) == mvps.get(str(years[i])),
+        }
+        for i in order
+    ]
+
+
+def predict_season(year):
+    return predict_rows(load_players(year))
+
+
+def predict_all():
+    # Every player-season in the table, scored in one multiply
+    return predict_rows(load_players())
+
+
+def with_probabilities(ranking, predictions):
+    # The calculate_score ranking with each player's model probability alongside (None if not in the table)
+    by_name = {normalize_name(row['Player']): row['MVP Probability'] for row in predictions}
+    return [dict(row, **{'MVP Probability': by_name.get(normalize_name(row['Player']))}) for row in ranking]
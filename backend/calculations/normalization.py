@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+# <stat>_Score columns for player rows, computed on whole columns: the rows are
+# joined to their season's averages once and divided ("ratio", the original
+# score), or scored against the other players of the same season ("zscore",
+# "percentile"), with no per-row Python.
+SCORE_STATS = [
+    # (score name, player column, league_avgs.csv column)
+    ("PPG", "PPG", "Top 20 PPG Avg"),
+    ("APG", "APG", "Top 20 APG Avg"),
+    ("RPG", "RPG", "Top 20 RPG Avg"),
+    ("SPG", "SPG", "Top 20 SPG Avg"),
+    ("BPG", "BPG", "Top 20 BPG Avg"),
+    ("eFG%", "effectFgPercent", "Top 20 eFG% Avg"),
+]
+MODES = ('ratio', 'zscore', 'percentile')
+
+
+def season_labels(seasons):
+    # 1998 -> "1998-99"; values that are already "YYYY-YY" strings are kept
+    seasons = pd.Series(seasons)
+    numeric = pd.to_numeric(seasons, errors='coerce')
+    years = numeric.dropna().astype(int)
+    labels = seasons.astype(object).copy()
+    labels[years.index] = years.astype(str) + '-' + (years + 1).astype(str).str[-2:]
+    return labels
+
+
+def add_score_columns(player_stats, averages=None, mode='ratio', stats=SCORE_STATS, season_column='season'):
+    if mode not in MODES:
+        raise ValueError(f"Unknown normalization mode {mode!r}; choose from {MODES}")
+    player_stats = player_stats.copy()
+    player_stats[season_column] = season_labels(player_stats[season_column]).to_numpy()
+
+    if mode == 'ratio':
+        # One left join for all stats; rows without a season average get NaN, as before
+        average_columns = [average_column for _, _, average_column in stats]
+        season_averages = averages[['Season'] + average_columns].drop_duplicates('Season')
+        joined = pd.DataFrame({'Season': player_stats[season_column].to_numpy()}).merge(
+            season_averages, on='Season', how='left', validate='many_to_one'
+        )
+        for name, column, average_column in stats:
+            ratio = pd.to_numeric(player_stats[column], errors='coerce').to_numpy(dtype=float) / joined[average_column].to_numpy(dtype=float)
+            player_stats[f"{name}_Score"] = np.round(ratio, 2)
+        return player_stats
+
+    for name, column, _ in stats:
+        values = pd.to_numeric(player_stats[column], errors='coerce')
+        seasons = player_stats[season_column]
+        by_season = values.groupby(seasons, sort=False)
+        if mode == 'zscore':
+            deviation = values - by_season.transform('mean')
+            std = np.sqrt((deviation ** 2).groupby(seasons, sort=False).transform('mean'))
+            score = deviation / std.where(std > 0)
+        else:
+            score = by_season.rank(pct=True)
+        player_stats[f"{name}_Score"] = np.round(score.to_numpy(dtype=float), 2)
+    return player_stats
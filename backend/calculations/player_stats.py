@@ -1,48 +1,46 @@
 import numpy as np
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
-from calculations.mvp_calculations import get_mvps
-
-def get_filtered_player_data(year, lwr_points, lwr_gs, lwr_efg):
+from calculations.mvp_calculations import get_mvps, mvp_index_version
+from calculations.threshold_index import get_threshold_index
+from calculations.team_stats import get_team_stats_by_year, standings_version
+from calculations.season_store import season_version
+from calculations.single_flight import run_concurrently
+from calculations.metrics import stage
+
+def get_season_mvp(year):
     try:
-        # Fetch data from the basketball reference site
-        url_player = f"https://www.basketball-reference.com/leagues/NBA_{year}_per_game.html"
-        response_player = requests.get(url_player)
-        response_player.encoding = 'utf-8'
-
-        # Parse the HTML page
-        stats_page = BeautifulSoup(response_player.text, 'html.parser')
-        column_headers = [header.getText() for header in stats_page.findAll('tr')[0].findAll("th")]
-        rows = stats_page.findAll('tr')[1:]
-        player_stats = [
-            [col.getText() for col in row.findAll("td")]
-            for row in rows if row.find("td")
-        ]
-
-        # Create a DataFrame
-        data = pd.DataFrame(player_stats, columns=column_headers[1:])
-        mvp_categories = ["GS", "eFG%", "STL", "TRB", "AST", "PTS"]
-        for category in mvp_categories:
-            data[category] = pd.to_numeric(data[category], errors='coerce')
+        return get_mvps(year)
+    except KeyError as e:
+        print(f"Warning: {e}")
+        return None
 
-        # Filter data
-        filtered_data = data[
-            (data["PTS"] > lwr_points) &
-            (data["GS"] > lwr_gs) &
-            (data["eFG%"] > lwr_efg)
-        ].copy()
+def season_inputs_version(year):
+    # Per-game table, standings and MVP index together: refreshing any of them
+    # gives the season's rankings a new version
+    return f"{season_version(year)}:{standings_version(year)}:{mvp_index_version()}"
+
+def load_season_inputs(year):
+    # Standings, the per-game threshold index and the MVP, loaded side by side;
+    # concurrent requests for the same season share each load
+    year = str(year)
+    with stage('load_inputs'):
+        all_teams, index, mvp = run_concurrently(
+            (('standings', year), get_team_stats_by_year, year),
+            (('per_game', year), get_threshold_index, year),
+            (('mvp', year), get_season_mvp, year),
+        )
+    return all_teams, index, mvp
 
-        # Rank players based on categories
-        for category in mvp_categories:
-            filtered_data[f"{category}_Rk"] = filtered_data[category].rank(pct=True)
+def get_filtered_player_data(year, lwr_points, lwr_gs, lwr_efg):
+    try:
+        # Answer the thresholds from the season's index (built once from the local store)
+        index = get_threshold_index(year)
+        with stage('filter'):
+            filtered_data = rank_player_data(index.filter(lwr_points, lwr_gs, lwr_efg))
 
         # Get MVP data
-        try:
-            mvp = get_mvps(year)
-        except KeyError as e:
-            print(f"Warning: {e}")
-            mvp = None
+        mvp = get_season_mvp(year)
 
         return filtered_data, mvp
 
@@ -54,6 +52,32 @@ def get_filtered_player_data(year, lwr_points, lwr_gs, lwr_efg):
         raise RuntimeError(f"An unexpected error occurred in get_filtered_player_data: {e}")
 
 
+MVP_CATEGORIES = ["GS", "eFG%", "STL", "TRB", "AST", "PTS"]
+
+def filter_player_data(data, lwr_points, lwr_gs, lwr_efg):
+    data = data.copy()
+    for category in MVP_CATEGORIES:
+        data[category] = pd.to_numeric(data[category], errors='coerce')
+
+    # Filter data
+    filtered_data = data[
+        (data["PTS"] > lwr_points) &
+        (data["GS"] > lwr_gs) &
+        (data["eFG%"] > lwr_efg)
+    ].copy()
+
+    return rank_player_data(filtered_data)
+
+
+def rank_player_data(filtered_data):
+    # Rank players based on categories
+    for category in MVP_CATEGORIES:
+        filtered_data[category] = pd.to_numeric(filtered_data[category], errors='coerce')
+        filtered_data[f"{category}_Rk"] = filtered_data[category].rank(pct=True)
+
+    return filtered_data
+
+
 def get_mvp_data(data, player):
     try:
         # Check if the player exists in the data
@@ -65,7 +89,7 @@ def get_mvp_data(data, player):
         row_array = np.asarray(row)[0]
         numeric_indices = [i for i in range(4, 29)]  # Indices of numeric fields
         row_array = [
-            float(row_array[i]) if i in numeric_indices and row_array[i] != '' else 0.0
+            float(row_array[i]) if i in numeric_indices and row_array[i] != '' and not pd.isna(row_array[i]) else 0.0
             if i in numeric_indices else row_array[i]
             for i in range(len(row_array))
         ]
@@ -0,0 +1,92 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from calculations.metrics import cache_lookup
+
+# Bounded LRU/TTL cache for finished /result bodies. Keys carry the versions of
+# the season's per-game table, standings and MVP index, so refreshing any of
+# them never serves a ranking built from old data.
+MAX_ENTRIES = 256
+TTL_SECONDS = 600
+
+
+def make_etag(body):
+    # Strong validator: identical bytes <=> identical tag
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+class ResultCache:
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry['stored_at'] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        cache_lookup('result', entry is not None)
+        return entry
+
+    def put(self, key, body):
+        entry = {'body': body, 'etag': make_etag(body), 'stored_at': time.monotonic()}
+        with self._lock:
+            # A new data version for the season makes its older rankings stale
+            stale = [other for other in self._entries if other[0] == key[0] and other[-1] != key[-1]]
+            for other in stale:
+                del self._entries[other]
+            self.invalidations += len(stale)
+
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def invalidate(self, year=None):
+        # Drop every entry, or only those for one season
+        with self._lock:
+            keys = [key for key in self._entries if year is None or key[0] == str(year)]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def result_key(year, lwr_points, lwr_efg, lwr_gs, version, formula='legacy'):
+    # Normalized so "15", "15.0" and " 15 " share one entry; the data version stays last
+    return (str(year).strip(), round(float(lwr_points), 4), round(float(lwr_efg), 4), int(lwr_gs), formula, version)
+
+
+result_cache = ResultCache()
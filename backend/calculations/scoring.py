@@ -0,0 +1,164 @@
+import json
+import numpy as np
+import pandas as pd
+from calculations.team_stats import MULTI_TEAM_PATTERN, Standings
+from calculations.mvp_calculations import normalize_name
+from calculations.cache_manager import backend_path
+
+# Positional layout read by calculate_score: (column index, multiplier, weight).
+# The indices are the ones calculate_score uses on a get_mvp_data row, so both
+# paths read exactly the same cells. Terms are summed in the same order as
+# calculate_score so the floats match as well.
+SCORE_TERMS = [
+    (14, 1, 0.28),   # pts
+    (12, 3, 0.12),   # rbs
+    (13, 4, 0.16),   # ast
+    (10, 60, 0.21),  # efg
+    (11, 20, 0.08),  # stl
+]
+WINS_INDEX = 14
+RANK_INDEX = 15
+TEAM_INDEX = 2
+TEAM_WEIGHT = 0.15
+FINAL_TEAM_COLUMN = 'Final Team'
+
+# The same terms as a (players, term) matrix, for scoring with other weights
+# (e.g. the ones modeling/weight_search.py exports to WEIGHTS_FILE). "team" is
+# wins + rank; the rest are the multiplied stats, in SCORE_TERMS order.
+TERM_NAMES = ['team', 'pts', 'rbs', 'ast', 'efg', 'stl']
+LEGACY_WEIGHTS = dict(zip(TERM_NAMES, [TEAM_WEIGHT] + [weight for _, _, weight in SCORE_TERMS]))
+WEIGHTS_FILE = backend_path("data", "score_weights.json")
+
+
+def _numeric_column(data, index):
+    # get_mvp_data turns '' into 0.0 and everything else into a float
+    return pd.to_numeric(data.iloc[:, index], errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)
+
+
+def resolve_final_teams(data):
+    # Multi-team rows ("TOT"/"2TM") take the last team the player appeared for,
+    # which is the team they finished the season with.
+    teams = data.iloc[:, TEAM_INDEX].astype(str)
+    multi_team = teams.str.fullmatch(MULTI_TEAM_PATTERN)
+    last_team = teams[~multi_team].groupby(data['Player'][~multi_team], sort=False).last()
+    return teams.where(~multi_team, data['Player'].map(last_team))
+
+
+def join_teams(filtered_data, all_teams):
+    # One row per player (get_mvp_data always returns the first match for a name),
+    # joined once against the standings; players without a team row are dropped.
+    if FINAL_TEAM_COLUMN in filtered_data.columns:
+        final_teams = filtered_data[FINAL_TEAM_COLUMN]
+    else:
+        final_teams = resolve_final_teams(filtered_data)
+
+    first_rows = ~filtered_data['Player'].duplicated(keep='first').to_numpy()
+    players = filtered_data[first_rows]
+    final_teams = final_teams[first_rows]
+
+    # Resolve each distinct abbreviation once (aliases included), then join
+    abbreviations = final_teams.fillna('').astype(str).to_numpy()
+    standings = all_teams if isinstance(all_teams, Standings) else Standings(all_teams)
+    teams = pd.DataFrame(
+        [
+            (team_abb, team['Wins'], team['Rank'])
+            for team_abb, team in ((team_abb, standings.find(team_abb)) for team_abb in pd.unique(abbreviations))
+            if team
+        ],
+        columns=['Team Abbreviation', 'Wins', 'Rank']
+    )
+    keys = pd.DataFrame({'Team Abbreviation': abbreviations})
+    joined = keys.merge(teams, on='Team Abbreviation', how='left')
+
+    found = joined['Wins'].notna().to_numpy()
+    players = players[found]
+    joined = joined[found]
+    return (
+        players,
+        joined['Team Abbreviation'].to_numpy(),
+        joined['Wins'].to_numpy(dtype=np.int64),
+        joined['Rank'].to_numpy(dtype=np.int64),
+    )
+
+
+def score_matrix(players):
+    # Same arithmetic as calculate_score, evaluated over whole columns
+    wins = np.trunc(_numeric_column(players, WINS_INDEX))
+    rank = np.trunc(_numeric_column(players, RANK_INDEX))
+    score = TEAM_WEIGHT * (wins + rank)
+    for index, multiplier, weight in SCORE_TERMS:
+        score = score + weight * (_numeric_column(players, index) * multiplier)
+    return score
+
+
+def term_matrix(players):
+    columns = [np.trunc(_numeric_column(players, WINS_INDEX)) + np.trunc(_numeric_column(players, RANK_INDEX))]
+    columns += [_numeric_column(players, index) * multiplier for index, multiplier, _ in SCORE_TERMS]
+    return np.column_stack(columns)
+
+
+def weight_vector(weights):
+    missing = [name for name in TERM_NAMES if name not in weights]
+    if missing:
+        raise RuntimeError(f"Score weights are missing terms {missing}")
+    return np.array([float(weights[name]) for name in TERM_NAMES])
+
+
+def load_weights(path=WEIGHTS_FILE):
+    # {"weights": {"team": ..., "pts": ..., ...}, ...} -> {term: weight}
+    try:
+        with open(path, 'r') as file:
+            config = json.load(file)
+    except FileNotFoundError:
+        raise RuntimeError(f"No score weights at {path}; run python modeling/weight_search.py --export")
+    weights = config['weights']
+    weight_vector(weights)
+    return weights
+
+
+def formula_table(players, wins, rank, columns):
+    # The columns a formula reads, as float arrays ('' and missing values are 0, like get_mvp_data)
+    joined = {'Wins': wins, 'Rank': rank}
+    return {
+        name: np.asarray(joined[name], dtype=np.float64) if name in joined
+        else pd.to_numeric(players[name], errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)
+        for name in set(columns) if name in joined or name in players.columns
+    }
+
+
+def season_scores(filtered_data, all_teams, weights=None, plan=None):
+    # weights=None and plan=None is calculate_score exactly; a {term: weight}
+    # dict rescales its terms; a compiled formula plan replaces it altogether
+    players, teams, wins, rank = join_teams(filtered_data, all_teams)
+    if plan is not None:
+        score = plan.evaluate(formula_table(players, wins, rank, plan.columns.values()), len(players))
+    elif weights is not None:
+        score = term_matrix(players) @ weight_vector(weights)
+    else:
+        score = score_matrix(players)
+    return pd.DataFrame({
+        'Player': players['Player'].to_numpy(),
+        'Team': teams,
+        'Wins': wins,
+        'Rank': rank,
+        'MVP Score': score,
+    })
+
+
+def rank_season(filtered_data, all_teams, mvp, weights=None, plan=None):
+    scores = season_scores(filtered_data, all_teams, weights, plan)
+    rounded = [round(float(score), 2) for score in scores['MVP Score']]
+
+    # Stable sort keeps ties in table order, matching sorted(..., reverse=True)
+    order = np.argsort(-np.asarray(rounded, dtype=np.float64), kind='stable')
+    names = [str(name) for name in scores['Player']]
+    # The award index stores plain-ASCII names, the per-game table keeps accents
+    mvp_name = normalize_name(mvp)
+    return [
+        {
+            'Player': names[i],
+            'MVP Score': rounded[i],
+            'MVP': (normalize_name(names[i]) == mvp_name)
+        }
+        for i in order
+    ]
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import calendar
+import numpy as np
+import pandas as pd
+from bs4 import BeautifulSoup
+from calculations import fetch
+from calculations.html_tables import extract_table, table_columns
+from calculations.cache_manager import backend_path, atomic_write, file_lock, season_ttl, season_year
+from calculations.metrics import stage
+
+# Each season's per-game table is stored once as one .npy file per column, with a
+# manifest describing the columns, their dtypes and a content version. Reads are
+# memory-mapped, so serving a season needs no network and no HTML parsing.
+STORE_DIR = backend_path("season_store")
+MANIFEST_FILE = os.path.join(STORE_DIR, "manifest.json")
+FORMAT_VERSION = 1
+KEEP_VERSIONS = 2  # per season; older ones are deleted on ingest, workers still mapping them keep their pages
+
+PER_GAME_URL = fetch.BASKETBALL_REFERENCE_URL + "/leagues/NBA_{year}_per_game.html"
+PER_GAME_TABLE_ID = "per_game_stats"
+
+_manifest_cache = {'mtime': None, 'data': None}
+
+
+def fetch_per_game_table(year):
+    year = season_year(year)
+    url_player = PER_GAME_URL.format(year=year)
+    with stage('per_game_fetch'):
+        response_player = fetch.get(url_player)
+    response_player.raise_for_status()
+    response_player.encoding = 'utf-8'
+    with stage('per_game_parse'):
+        return parse_per_game_html(response_player.text)
+
+
+def parse_per_game_html(html):
+    # Only the per_game_stats table is materialized; other layouts fall back to BeautifulSoup
+    columns = table_columns(extract_table(html, PER_GAME_TABLE_ID))
+    if columns is None:
+        return _parse_per_game_soup(html)
+    return pd.DataFrame(columns)
+
+
+def _parse_per_game_soup(html):
+    # The original full-page parse, exactly as get_filtered_player_data used to do it
+    stats_page = BeautifulSoup(html, 'html.parser')
+    column_headers = [header.getText() for header in stats_page.findAll('tr')[0].findAll("th")]
+    rows = stats_page.findAll('tr')[1:]
+    player_stats = [
+        [col.getText() for col in row.findAll("td")]
+        for row in rows if row.find("td")
+    ]
+    return pd.DataFrame(player_stats, columns=column_headers[1:])
+
+
+def to_typed_columns(data):
+    # Columns whose non-empty cells all parse as numbers become float64 (blank -> NaN),
+    # everything else becomes a fixed-width unicode array.
+    columns = []
+    for name in data.columns:
+        values = data[name].astype(str).str.strip()
+        numeric = pd.to_numeric(values.replace('', np.nan), errors='coerce')
+        if numeric.notna().sum() == (values != '').sum():
+            array = numeric.to_numpy(dtype=np.float64)
+        else:
+            array = np.asarray(values.to_numpy(dtype=object), dtype=str)
+        columns.append((name, array))
+    return columns
+
+
+def _read_manifest():
+    try:
+        mtime = os.stat(MANIFEST_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return {'format': FORMAT_VERSION, 'seasons': {}}
+
+    if _manifest_cache['mtime'] != mtime:
+        with open(MANIFEST_FILE, 'r') as file:
+            _manifest_cache['data'] = json.load(file)
+        _manifest_cache['mtime'] = mtime
+    return _manifest_cache['data']
+
+
+def _write_manifest(manifest):
+    atomic_write(MANIFEST_FILE, json.dumps(manifest, indent=2, sort_keys=True))
+
+
+def write_season(year, data, source=None):
+    year = str(season_year(year))
+    columns = to_typed_columns(data)
+
+    # Write into a fresh directory and only then point the manifest at it, so a
+    # reader never sees a half-written season.
+    digest = hashlib.sha256()
+    for name, array in columns:
+        digest.update(name.encode('utf-8'))
+        digest.update(array.dtype.str.encode('ascii'))
+        digest.update(np.ascontiguousarray(array).tobytes())
+    version = digest.hexdigest()[:16]
+
+    season_dir = os.path.join(STORE_DIR, year, version)
+    os.makedirs(season_dir, exist_ok=True)
+    entries = []
+    for i, (name, array) in enumerate(columns):
+        file_name = f"col_{i:02d}.npy"
+        np.save(os.path.join(season_dir, file_name), array, allow_pickle=False)
+        entries.append({'name': name, 'dtype': array.dtype.str, 'file': file_name})
+
+    # Seasons may be ingested concurrently, by several workers; serialize the manifest update
+    with file_lock(MANIFEST_FILE):
+        manifest = dict(_read_manifest())
+        manifest['format'] = FORMAT_VERSION
+        manifest['seasons'] = dict(manifest.get('seasons', {}))
+        manifest['seasons'][year] = {
+            'version': version,
+            'rows': int(len(data)),
+            'columns': entries,
+            'source': source,
+            'ingested_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        }
+        _write_manifest(manifest)
+        prune_season(year)
+    return version
+
+
+def prune_season(year, keep=KEEP_VERSIONS):
+    # The season in progress is re-ingested every few hours and each change is a
+    # new version directory; only the newest `keep` (always the live one) stay
+    year = str(season_year(year))
+    live = _read_manifest()['seasons'].get(year, {}).get('version')
+    year_dir = os.path.join(STORE_DIR, year)
+    versions = sorted(
+        (entry for entry in os.scandir(year_dir) if entry.is_dir()),
+        key=lambda entry: entry.stat().st_mtime, reverse=True,
+    )
+    for entry in versions[keep:]:
+        if entry.name != live:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def ingest_season(year):
+    year = season_year(year)
+    url = PER_GAME_URL.format(year=year)
+    data = fetch_per_game_table(year)
+    return write_season(year, data, source=url)
+
+
+def season_version(year):
+    season = _read_manifest()['seasons'].get(str(year))
+    return season['version'] if season else None
+
+
+def has_season(year):
+    return season_version(year) is not None
+
+
+def is_stale(year):
+    # Only the season in progress changes after it is stored
+    season = _read_manifest()['seasons'].get(str(year))
+    ttl = season_ttl(year)
+    if season is None or ttl is None:
+        return season is None
+    ingested_at = calendar.timegm(time.strptime(season['ingested_at'], '%Y-%m-%dT%H:%M:%SZ'))
+    return time.time() - ingested_at >= ttl
+
+
+def load_season(year):
+    year = season_year(year)
+    season = _read_manifest()['seasons'].get(str(year))
+    if season is None:
+        raise KeyError(f"Season {year} is not in the season store. Run the ingest step first.")
+
+    season_dir = os.path.join(STORE_DIR, str(year), season['version'])
+    data = {}
+    for entry in season['columns']:
+        data[entry['name']] = np.load(os.path.join(season_dir, entry['file']), mmap_mode='r', allow_pickle=False)
+    # copy=False keeps the numeric columns as views of the mapped files, so
+    # every worker reading a season shares its pages (pandas >= 2)
+    return pd.DataFrame(data, columns=[entry['name'] for entry in season['columns']], copy=False)
+
+
+def get_season_table(year):
+    # Read-through: a season missing from the store (or the current one, once
+    # stale) is fetched once and kept
+    year = season_year(year)
+    if is_stale(year):
+        with file_lock(os.path.join(STORE_DIR, f"ingest_{year}")):
+            if is_stale(year):
+                ingest_season(year)
+    return load_season(year)
+
+
+if __name__ == '__main__':
+    # Usage: python -m calculations.season_store <first_year> [last_year]
+    if len(sys.argv) < 2:
+        print("Usage: python -m calculations.season_store <first_year> [last_year]")
+        sys.exit(1)
+
+    first_year = int(sys.argv[1])
+    last_year = int(sys.argv[2]) if len(sys.argv) > 2 else first_year
+    for year in range(first_year, last_year + 1):
+        try:
+            version = ingest_season(year)
+            print(f"Stored season {year} (version {version})")
+        except Exception as e:
+            print(f"Error storing season {year}: {e}")
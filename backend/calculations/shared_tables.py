@@ -0,0 +1,217 @@
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from calculations.cache_manager import backend_path, atomic_write, file_lock
+
+# The season-wide tables every worker reads (player seasons, standings)
+# published once as read-only .npy column files under a versioned directory.
+# Workers memory-map them, so N gunicorn workers share one copy in the page
+# cache instead of N pandas copies. CURRENT names the live version and is
+# replaced atomically (os.replace); workers notice the new name within
+# CHECK_INTERVAL seconds and re-map without a restart. The per-game tables
+# already live this way in the season store; league_avgs.csv is only read by
+# the offline modeling scripts, so it is not published.
+#   python -m calculations.shared_tables publish
+SHARED_DIR = backend_path("shared_tables")
+POINTER_FILE = os.path.join(SHARED_DIR, "CURRENT")
+SCHEMA_FILE = "tables.json"
+FORMAT_VERSION = 1
+CHECK_INTERVAL = 1.0
+KEEP_VERSIONS = 3  # older versions are deleted on publish; workers still mapping them keep their pages
+
+DATA_DIR = backend_path("data")
+PLAYERS_FILE = os.path.join(DATA_DIR, "nba_player_stats_with_scores.csv")
+
+
+class SharedTable:
+    def __init__(self, name, directory, schema):
+        self.name = name
+        self.rows = schema['rows']
+        self.order = [entry['name'] for entry in schema['columns']]
+        self.columns = {
+            entry['name']: np.load(os.path.join(directory, entry['file']), mmap_mode='r', allow_pickle=False)
+            for entry in schema['columns']
+        }
+        # Year -> [start, stop): rows are stored sorted by Year, so a season is a contiguous view
+        self.years = {int(year): bounds for year, bounds in schema.get('years', {}).items()}
+
+    def frame(self, columns=None, year=None):
+        # Numeric columns are views of the mapped files (pandas >= 2 keeps them uncopied)
+        start, stop = self.years.get(int(year), (0, 0)) if year is not None else (0, self.rows)
+        names = self.order if columns is None else columns
+        return pd.DataFrame({name: self.columns[name][start:stop] for name in names}, columns=names, copy=False)
+
+
+class SharedDataset:
+    def __init__(self, version):
+        self.version = version
+        directory = os.path.join(SHARED_DIR, version)
+        with open(os.path.join(directory, SCHEMA_FILE), 'r') as file:
+            schema = json.load(file)
+        if schema.get('format') != FORMAT_VERSION:
+            raise RuntimeError(f"Shared tables {version} have format {schema.get('format')}, expected {FORMAT_VERSION}")
+        self.tables = {
+            name: SharedTable(name, os.path.join(directory, name), table)
+            for name, table in schema['tables'].items()
+        }
+
+    def table(self, name):
+        return self.tables.get(name)
+
+
+# Builders: table name -> DataFrame (or None when its source is missing)
+
+def players_frame():
+    if not os.path.exists(PLAYERS_FILE):
+        return None
+    players = pd.read_csv(PLAYERS_FILE)
+    # evaluate.py labels the season ending in x as "x-(x+1)"; Year is the /result year
+    players['Year'] = players['season'].astype(str).str[:4].astype(int)
+    return players
+
+
+def standings_frame():
+    from calculations.team_stats import standings_cache
+    rows = []
+    for key in standings_cache.keys("cache_*.json"):
+        year = key[len("cache_"):-len(".json")]
+        for team in standings_cache.read_json(key) or []:
+            rows.append(dict(team, Year=int(year)))
+    return pd.DataFrame(rows) if rows else None
+
+
+BUILDERS = {
+    'players': players_frame,
+    'standings': standings_frame,
+}
+
+
+def typed_columns(frame):
+    # Numeric and bool columns keep their dtype; everything else becomes fixed-width unicode
+    for name in frame.columns:
+        values = frame[name]
+        if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+            yield str(name), values.to_numpy()
+        else:
+            yield str(name), np.asarray(values.fillna('').astype(str).tolist(), dtype=str)
+
+
+def write_table(directory, frame):
+    frame = frame.sort_values('Year', kind='stable').reset_index(drop=True)
+    os.makedirs(directory, exist_ok=True)
+    entries = []
+    for i, (name, array) in enumerate(typed_columns(frame)):
+        file_name = f"col_{i:02d}.npy"
+        np.save(os.path.join(directory, file_name), np.ascontiguousarray(array), allow_pickle=False)
+        entries.append({'name': name, 'dtype': array.dtype.str, 'file': file_name})
+
+    years = frame['Year'].to_numpy()
+    bounds = np.flatnonzero(np.r_[True, years[1:] != years[:-1], True])
+    return {
+        'rows': int(len(frame)),
+        'columns': entries,
+        'years': {str(int(years[start])): [int(start), int(stop)] for start, stop in zip(bounds[:-1], bounds[1:])},
+    }
+
+
+_dataset = None
+_checked_at = 0.0
+_failed_version = None  # the last version that failed to attach; not retried until CURRENT moves on
+_attach_lock = threading.Lock()
+
+
+def current_version():
+    try:
+        with open(POINTER_FILE, 'r') as file:
+            return file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def prune(keep=KEEP_VERSIONS):
+    # Oldest published versions beyond `keep` (never the live one)
+    live = current_version()
+    versions = sorted(
+        (entry for entry in os.scandir(SHARED_DIR) if entry.is_dir() and not entry.name.startswith('.')),
+        key=lambda entry: entry.stat().st_mtime, reverse=True,
+    )
+    for entry in versions[keep:]:
+        if entry.name != live:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def publish(builders=None):
+    # Materialize every table into a new version directory, then swap CURRENT to it
+    global _checked_at
+    builders = BUILDERS if builders is None else builders
+    with file_lock(POINTER_FILE):
+        version = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{os.urandom(4).hex()}"
+        directory = os.path.join(SHARED_DIR, version)
+        tables = {}
+        for name, build in builders.items():
+            frame = build()
+            if frame is not None and len(frame):
+                tables[name] = write_table(os.path.join(directory, name), frame)
+        schema = {'format': FORMAT_VERSION, 'version': version, 'tables': tables}
+        atomic_write(os.path.join(directory, SCHEMA_FILE), json.dumps(schema, indent=2))
+        atomic_write(POINTER_FILE, version)
+        prune()
+    _checked_at = 0.0  # this process sees the new version right away
+    return version
+
+
+def current():
+    # The live dataset, re-attached when CURRENT moves on; None if nothing is published.
+    # A version that cannot be attached (pruned, half-written, another format)
+    # keeps the dataset already in use, or None, so callers fall back to the
+    # CSVs and the standings cache instead of failing the request
+    global _dataset, _checked_at, _failed_version
+    with _attach_lock:
+        now = time.monotonic()
+        if _checked_at and now - _checked_at < CHECK_INTERVAL:
+            return _dataset
+        _checked_at = now
+        version = None
+        try:
+            version = current_version()
+            if version is None:
+                _dataset = None
+            elif (_dataset is None or _dataset.version != version) and version != _failed_version:
+                _dataset = SharedDataset(version)
+        except (OSError, ValueError, KeyError, RuntimeError) as e:
+            print(f"Could not attach shared tables {version}: {e}; keeping {_dataset.version if _dataset else 'the CSV fallback'}")
+            _failed_version = version
+        return _dataset
+
+
+def table(name):
+    dataset = current()
+    return None if dataset is None else dataset.table(name)
+
+
+def status():
+    dataset = current()
+    if dataset is None:
+        return {'version': None, 'tables': {}}
+    return {
+        'version': dataset.version,
+        'tables': {
+            name: {'rows': shared.rows, 'columns': len(shared.columns), 'years': len(shared.years)}
+            for name, shared in dataset.tables.items()
+        },
+    }
+
+
+if __name__ == '__main__':
+    # Usage: python -m calculations.shared_tables [publish|status]
+    command = sys.argv[1] if len(sys.argv) > 1 else 'status'
+    if command == 'publish':
+        print(f"Published shared tables {publish()}")
+    print(json.dumps(status(), indent=2))
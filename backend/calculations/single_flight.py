@@ -0,0 +1,56 @@
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Concurrent callers asking for the same key share one in-flight call: the first
+# runs it, the rest block on its Future. The season loads behind /result
+# (per-game table, standings, MVP) also run side by side on a shared pool, so a
+# cold request costs about as long as the slowest of them.
+UPSTREAM_WORKERS = 8
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.shared = 0
+
+    def do(self, key, fn, *args):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.started += 1
+            else:
+                self.shared += 1
+
+        if leader:
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    del self._calls[key]
+        return future.result()
+
+    def stats(self):
+        with self._lock:
+            return {'started': self.started, 'shared': self.shared, 'in_flight': len(self._calls)}
+
+
+flights = SingleFlight()
+executor = ThreadPoolExecutor(max_workers=UPSTREAM_WORKERS, thread_name_prefix='upstream')
+
+
+def run_concurrently(*calls):
+    # calls: (key, fn, *args) tuples -> results in the same order; the first error is raised.
+    # Each call runs in a copy of the caller's context, so its stage timings reach the request.
+    futures = [
+        executor.submit(contextvars.copy_context().run, flights.do, key, fn, *args)
+        for key, fn, *args in calls
+    ]
+    return [future.result() for future in futures]
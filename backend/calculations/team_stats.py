@@ -1,39 +1,187 @@
-import requests
 from bs4 import BeautifulSoup
-import time
 import os
-import json
+import threading
+from calculations import fetch
+from calculations.html_tables import extract_tables
+from calculations.cache_manager import backend_path, get_cache, season_ttl, season_year
+from calculations.metrics import cache_lookup, stage
+from calculations import shared_tables
 
-# Set up a requests session with headers
-session = requests.Session()
-session.headers.update({
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-})
+# Standings cache next to the package (not the CWD), shared safely between workers
+CACHE_DIR = backend_path("cache")
+standings_cache = get_cache('standings', CACHE_DIR)
 
-# Ensure the cache directory exists
-CACHE_DIR = "cache"
-if not os.path.exists(CACHE_DIR):
-    os.makedirs(CACHE_DIR)
+# Per-game rows for players who changed teams ("TOT" on older pages, "2TM"/"3TM"... now)
+MULTI_TEAM_PATTERN = r'TOT|\dTM'
 
-def get_team_stats_by_year(year):
-    cache_file = os.path.join(CACHE_DIR, f"cache_{year}.json")  # Use cache directory
-    if os.path.exists(cache_file):
-        with open(cache_file, 'r') as file:
-            return json.load(file)
-    
-    url_team = f"https://www.basketball-reference.com/leagues/NBA_{year}_standings.html"
-    response = session.get(url_team)
-    
-    if response.status_code == 429:
-        print("Rate limit reached. Retrying after delay...")
-        time.sleep(10)
-        response = session.get(url_team)
+# Abbreviations that refer to the same franchise in different eras or sources
+FRANCHISE_ALIASES = {
+    'VAN': 'MEM',
+    'SEA': 'OKC',
+    'NJN': 'BRK',
+    'BKN': 'BRK',
+    'NOH': 'NOP',
+    'NOK': 'NOP',
+    'NOR': 'NOP',
+    'CHA': 'CHO',
+    'PHX': 'PHO',
+    'WSB': 'WAS',
+    'KCK': 'SAC',
+    'SDC': 'LAC',
+}
+ORIGINAL_HORNETS_LAST_YEAR = 2002  # CHH moved to New Orleans after the 2001-02 season
+
+STANDINGS_TABLE_IDS = ['divs_standings_E', 'divs_standings_W']
+
+
+class Standings(list):
+    # A season's teams (sorted worst to best, like before) plus an abbreviation
+    # index, so get_team is a dictionary lookup instead of a scan.
+
+    def __init__(self, teams, year=None, version=None):
+        super().__init__(teams)
+        self.year = year
+        self.version = version  # standings_version of the file these teams were read from
+        self.by_abbreviation = {}
+        self.by_franchise = {}
+        for team in self:
+            abbreviation = team['Team Abbreviation']
+            self.by_abbreviation.setdefault(abbreviation, team)
+            self.by_franchise.setdefault(franchise_of(abbreviation, year), team)
+
+    def find(self, team_abb):
+        team = self.by_abbreviation.get(team_abb)
+        if team is None:
+            team = self.by_franchise.get(franchise_of(team_abb, self.year))
+        return team
+
+
+_standings_index = {}  # year -> Standings; with Standings.find, the (year, abbreviation) lookup
+_index_lock = threading.Lock()
+_index_loaded = False
+_shared_standings = None  # the published standings table; its seasons become Standings on first use
+SHARED = 'shared'  # Standings.version of seasons read from it
+
+
+def franchise_of(team_abb, year=None):
+    if team_abb == 'CHH':
+        return 'NOP' if year is None or int(year) <= ORIGINAL_HORNETS_LAST_YEAR else 'CHO'
+    return FRANCHISE_ALIASES.get(team_abb, team_abb)
+
+
+def rank_teams(teams):
+    # Worst record first (ties keep page order), rank 1 = most wins
+    all_teams = sorted((team for team in teams if team is not None), key=lambda team: team['Wins'])
+    for i in range(len(all_teams)):
+        all_teams[i]['Rank'] = len(all_teams) - i
+    return all_teams
+
+
+def _add_season(year, teams, version=None):
+    standings = Standings(teams, year, version)
+    # Replaces the season's previous entry when a stale season is refreshed
+    _standings_index[str(year)] = standings
+    return standings
+
+
+def load_standings_index():
+    # Every cached season is read once per process, except finished seasons in the
+    # shared standings table (calculations/shared_tables.py): those are read from
+    # the mapped table, and only when a request needs them (see shared_season)
+    global _index_loaded, _shared_standings
+    dataset = shared_tables.current()
+    shared = dataset.table('standings') if dataset is not None else None
+    with _index_lock:
+        if shared is not _shared_standings:
+            # Seasons read from the previous version are read again from the new one
+            for year in [year for year, standings in _standings_index.items() if standings.version == SHARED]:
+                del _standings_index[year]
+            _shared_standings = shared
+
+        if not _index_loaded:
+            for key in standings_cache.keys("cache_*.json"):
+                year = key[len("cache_"):-len(".json")]
+                if shared is not None and int(year) in shared.years and season_ttl(year) is None:
+                    continue
+                version = standings_version(year)
+                all_teams = standings_cache.read_json(key, season_ttl(year))
+                if all_teams is not None:
+                    _add_season(year, all_teams, version)
+            _index_loaded = True
+
+
+def shared_season(year):
+    # A finished season from the shared standings table, or None. Only the ~30
+    # team rows of a season that is actually served become dicts in this worker
+    shared = _shared_standings
+    if shared is None or year not in shared.years or season_ttl(year) is not None:
+        return None
+    teams = shared.frame(year=year).drop(columns='Year').to_dict('records')
+    with _index_lock:
+        return _add_season(year, teams, SHARED)
+
+
+def cache_key(year):
+    return f"cache_{season_year(year)}.json"
+
+
+def standings_version(year):
+    # Changes whenever the season's standings file is rewritten (None before the first fetch)
+    try:
+        return os.stat(standings_cache.path(cache_key(year))).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def fetch_standings(year):
+    year = season_year(year)
+    url_team = f"{fetch.BASKETBALL_REFERENCE_URL}/leagues/NBA_{year}_standings.html"
+    # Rate limiting and 429 backoff are handled by the shared fetch layer
+    with stage('standings_fetch'):
+        response = fetch.get(url_team)
 
     if response.status_code != 200:
         raise Exception(f"Failed to fetch data for year {year}: {response.status_code}")
-    
-    response.encoding = 'utf-8' 
-    soup = BeautifulSoup(response.text, 'html.parser')
+
+    response.encoding = 'utf-8'
+    with stage('standings_parse'):
+        return rank_teams(parse_standings_html(response.text, year))
+
+
+def get_team_stats_by_year(year):
+    year = season_year(year)
+    load_standings_index()
+    ttl = season_ttl(year)
+    standings = _standings_index.get(str(year))
+    if standings is None:
+        standings = shared_season(year)
+    # The season in progress is re-read when its file is stale or another worker
+    # has rewritten it since this worker read it (results are keyed on that version)
+    version = standings_version(year)
+    if cache_lookup('standings', standings is not None and (ttl is None or (
+            standings.version == version and standings_cache.is_fresh(cache_key(year), ttl)))):
+        return standings
+
+    # One worker scrapes a missing or stale season; the others wait for its file.
+    # The version is taken before the read, so a rewrite in between reloads again
+    all_teams = standings_cache.get_or_create_json(cache_key(year), lambda: fetch_standings(year), ttl)
+
+    with _index_lock:
+        return _add_season(year, all_teams, version)
+
+def parse_standings_html(html, year=None):
+    # Only the two division tables are materialized; other layouts fall back to BeautifulSoup
+    tables = extract_tables(html, STANDINGS_TABLE_IDS)
+    if all(tables.get(table_id) for table_id in STANDINGS_TABLE_IDS):
+        return [
+            team_info_from_row(row)
+            for table_id in STANDINGS_TABLE_IDS
+            for row in tables[table_id] if 'full_table' in row.classes
+        ]
+    return _parse_standings_soup(html, year)
+
+def _parse_standings_soup(html, year=None):
+    soup = BeautifulSoup(html, 'html.parser')
 
     eastern_table = soup.find('table', {'id': 'divs_standings_E'})
     western_table = soup.find('table', {'id': 'divs_standings_W'})
@@ -43,16 +191,22 @@ def get_team_stats_by_year(year):
 
     eastern_teams = [extract_team_info(row) for row in eastern_table.find_all('tr', {'class': 'full_table'})]
     western_teams = [extract_team_info(row) for row in western_table.find_all('tr', {'class': 'full_table'})]
-    all_teams = bubble_sort(eastern_teams + western_teams)
+    return eastern_teams + western_teams
 
-    for i in range(len(all_teams)):
-        all_teams[i]['Rank'] = len(all_teams) - i  # Adjusted rank calculation
-    
-    # Save to cache
-    with open(cache_file, 'w') as file:
-        json.dump(all_teams, file)
-    
-    return all_teams
+def team_info_from_row(row):
+    # Same fields as extract_team_info, from a streamed TableRow
+    try:
+        href, team_name = row.links[0]
+        return {
+            'Team Name': team_name,
+            'Team Abbreviation': href.split('/')[-2].upper(),
+            'Wins': int(row.stats['wins']),
+            'Losses': int(row.stats['losses']),
+            'Win-Loss Percentage': row.stats['win_loss_pct']
+        }
+    except Exception as e:
+        print(f"Error extracting team info: {e}")
+        return None
 
 def extract_team_info(row):
     try:
@@ -72,16 +226,7 @@ def extract_team_info(row):
         print(f"Error extracting team info: {e}")
         return None
 
-def bubble_sort(arr):
-    n = len(arr)
-    for i in range(n):
-        for j in range(0, n-i-1):
-            if arr[j]['Wins'] > arr[j+1]['Wins']:
-                arr[j], arr[j+1] = arr[j+1], arr[j]
-    return arr
-
 def get_team(all_teams, team_abb):
-    for team in all_teams:
-        if team['Team Abbreviation'] == team_abb:
-            return team
-    return None
+    if isinstance(all_teams, Standings):
+        return all_teams.find(team_abb)
+    return Standings(all_teams).find(team_abb)
@@ -0,0 +1,87 @@
+import itertools
+import numpy as np
+import pandas as pd
+from calculations.season_store import get_season_table, season_version
+from calculations.scoring import FINAL_TEAM_COLUMN, resolve_final_teams
+from calculations.metrics import cache_lookup, stage
+
+# Columns the /result sliders filter on, in (lwr_points, lwr_gs, lwr_efg) order
+THRESHOLD_COLUMNS = ["PTS", "GS", "eFG%"]
+
+_season_indexes = {}
+
+
+class ThresholdIndex:
+    # Pre-sorted column orders for one season. A threshold query is a binary search
+    # per column; the smallest candidate set is then checked against the other
+    # columns through their inverse permutations, so only matching rows are touched.
+
+    def __init__(self, data):
+        # The season store's columns are memory-mapped and shared by every worker,
+        # so the index keeps them as they are (copy=False, pandas >= 2); only a
+        # threshold column that is not numeric yet is converted into a new array
+        columns = {name: data[name].to_numpy() for name in data.columns}
+        for column in THRESHOLD_COLUMNS:
+            if not pd.api.types.is_numeric_dtype(data[column]):
+                columns[column] = pd.to_numeric(data[column], errors='coerce').to_numpy()
+        # Resolved on the full table, before any threshold can hide a traded player's team rows
+        columns[FINAL_TEAM_COLUMN] = resolve_final_teams(data).to_numpy()
+        self.data = pd.DataFrame(columns, columns=list(columns), copy=False)
+
+        self.sorted_values = {}
+        self.orders = {}
+        self.positions = {}
+        self.valid_counts = {}
+        for column in THRESHOLD_COLUMNS:
+            values = self.data[column].to_numpy(dtype=np.float64)
+            order = np.argsort(values, kind='stable')  # NaN sorts last
+            positions = np.empty_like(order)
+            positions[order] = np.arange(len(order))
+            self.orders[column] = order
+            self.positions[column] = positions
+            self.sorted_values[column] = values[order]
+            self.valid_counts[column] = int(np.count_nonzero(~np.isnan(values)))
+
+    def _bounds(self, column, threshold):
+        # Rows strictly above the threshold occupy sorted positions [start, stop)
+        sorted_values = self.sorted_values[column]
+        stop = self.valid_counts[column]
+        start = int(np.searchsorted(sorted_values[:stop], threshold, side='right'))
+        return start, stop
+
+    def select(self, lwr_points, lwr_gs, lwr_efg):
+        bounds = {
+            column: self._bounds(column, threshold)
+            for column, threshold in zip(THRESHOLD_COLUMNS, (lwr_points, lwr_gs, lwr_efg))
+        }
+        driver = min(bounds, key=lambda column: bounds[column][1] - bounds[column][0])
+        start, stop = bounds[driver]
+        rows = self.orders[driver][start:stop]
+
+        for column, (start, stop) in bounds.items():
+            if column == driver or len(rows) == 0:
+                continue
+            positions = self.positions[column][rows]
+            rows = rows[(positions >= start) & (positions < stop)]
+
+        # Back to table order, as a boolean filter would return them
+        return np.sort(rows)
+
+    def filter(self, lwr_points, lwr_gs, lwr_efg):
+        return self.data.iloc[self.select(lwr_points, lwr_gs, lwr_efg)].copy()
+
+    def sweep(self, points_grid, gs_grid, efg_grid):
+        for lwr_points, lwr_gs, lwr_efg in itertools.product(points_grid, gs_grid, efg_grid):
+            yield (lwr_points, lwr_gs, lwr_efg), self.filter(lwr_points, lwr_gs, lwr_efg)
+
+
+def get_threshold_index(year):
+    # Built once per season and rebuilt only when the stored season changes
+    year = str(year)
+    cached = _season_indexes.get(year)
+    if not cache_lookup('threshold_index', cached is not None and cached[0] == season_version(year)):
+        table = get_season_table(year)
+        with stage('index_build'):
+            cached = (season_version(year), ThresholdIndex(table))
+        _season_indexes[year] = cached
+    return cached[1]
@@ -1,95 +1,67 @@
-import requests
 import pandas as pd
 import sys
 import os
+import json
+import time
+import calendar
+import hashlib
+import argparse
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from calculations.graphql_client import client
 from calculations.team_stats import get_team_stats_by_year
+from calculations.mvp_calculations import get_all_mvps, normalize_name
+from calculations.normalization import add_score_columns
+from calculations.cache_manager import atomic_path, backend_path, file_lock
+
+DATA_DIR = backend_path("data")
+PLAYER_STATS_FILE = os.path.join(DATA_DIR, "nba_player_stats.csv")
+SCORES_FILE = os.path.join(DATA_DIR, "nba_player_stats_with_scores.csv")
+AVERAGES_FILE = os.path.join(DATA_DIR, "league_avgs.csv")
+# Per-season content hashes of the raw nbaapi records behind nba_player_stats.csv
+MANIFEST_FILE = os.path.join(DATA_DIR, "nba_player_stats.manifest.json")
+
+FIRST_SEASON, LAST_SEASON = 1998, 2024  # range(FIRST_SEASON, LAST_SEASON)
+EMPTY_RETRY_DAYS = 7  # a season nbaapi returned empty for is asked for again after this long
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+# Both player queries for every requested season, packed into a few batched requests.
+# The incremental refresh decides staleness itself, so the on-disk query cache is bypassed.
+def fetch_player_data(seasons):
+    return client.fetch_player_seasons(seasons, use_cache=False)
+
+
+def season_hash(advanced, totals):
+    # Stable content hash of a season's raw records
+    payload = json.dumps([advanced, totals], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_FILE):
+        return {}
+    with open(MANIFEST_FILE, 'r') as file:
+        return json.load(file)
+
+
+def write_json(path, data):
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=2, sort_keys=True)
+
+
+def write_atomic(path, write):
+    with atomic_path(path) as tmp_path:
+        write(tmp_path)
+
+
+def build_season_rows(seasons, advanced_stats, totals_stats):
+    # Derived player rows for the given seasons only
+    advanced_df = pd.DataFrame(advanced_stats)
+    totals_df = pd.DataFrame(totals_stats)
+    if advanced_df.empty or totals_df.empty:
+        return pd.DataFrame()
 
-# API setup
-url = "https://www.nbaapi.com/graphql/"
-headers = {
-    "Content-Type": "application/json"
-}
-exit(0)
-
-
-# Function to fetch player advanced stats for a specific season
-def fetch_player_advanced_data(season):
-    query = f"""
-    query PlayerAdvanced {{
-        playerAdvanced(season: {season}) {{
-            playerName
-            position
-            team
-            games
-            per
-            usagePercent
-            offensiveWs
-            defensiveWs
-            winShares
-            offensiveBox
-            defensiveBox
-            vorp
-        }}
-    }}
-    """
-    payload = {"query": query, "variables": {}}
-    response = requests.post(url, headers={"Content-Type": "application/json"}, json=payload)
-    if response.status_code == 200:
-        data = response.json()
-        if 'data' in data and 'playerAdvanced' in data['data']:
-            for record in data['data']['playerAdvanced']:
-                record['season'] = season
-            return data['data']['playerAdvanced']
-    return []
-
-# Function to fetch player totals stats for a specific season
-def fetch_player_totals_data(season):
-    query = f"""
-    query PlayerTotals {{
-        playerTotals(season: {season}) {{
-            playerName
-            position
-            team
-            games
-            points
-            assists
-            totalRb
-            steals
-            blocks
-            turnovers
-            effectFgPercent
-        }}
-    }}
-    """
-    payload = {"query": query, "variables": {}}
-    response = requests.post(url, headers={"Content-Type": "application/json"}, json=payload)
-    if response.status_code == 200:
-        data = response.json()
-        if 'data' in data and 'playerTotals' in data['data']:
-            for record in data['data']['playerTotals']:
-                record['season'] = season
-            return data['data']['playerTotals']
-    return []
-
-# Fetch data for multiple seasons
-first_season, last_season = 1998, 2024  # Specify the range of seasons
-seasons = range(first_season, last_season)  # Include the last season
-advanced_stats, totals_stats = [], []
-
-for season in seasons:
-    print(f"Fetching advanced data for season {season}...")
-    advanced_stats.extend(fetch_player_advanced_data(season))
-    print(f"Fetching totals data for season {season}...")
-    totals_stats.extend(fetch_player_totals_data(season))
-
-# Convert player data to DataFrames
-advanced_df = pd.DataFrame(advanced_stats)
-totals_df = pd.DataFrame(totals_stats)
-
-if not advanced_df.empty and not totals_df.empty:
     # Merge advanced and totals data
-    print("Merging advanced and totals player data...")
     player_stats = pd.merge(totals_df, advanced_df, on=["playerName", "team", "season"], how="inner")
 
     # Exclude players who played for multiple teams
@@ -101,17 +73,19 @@ if not advanced_df.empty and not totals_df.empty:
     player_stats['RPG'] = round(player_stats['totalRb'] / player_stats['games_x'], 2)
     player_stats['SPG'] = round(player_stats['steals'] / player_stats['games_x'], 2)
     player_stats['BPG'] = round(player_stats['blocks'] / player_stats['games_x'], 2)
-    player_stats['MVP'] = 0
-    
+
+    # Label MVPs from the award index (all years in one lookup table)
+    mvp_by_year = get_all_mvps()
+    player_stats['MVP'] = (
+        player_stats['playerName'].map(normalize_name) == player_stats['season'].astype(str).map(mvp_by_year)
+    ).astype(int)
 
     # Filter players
     filtered_players = player_stats[(player_stats['PPG'] > 15) & (player_stats['games_x'] > 50)].copy()
     filtered_players['team'] = filtered_players['team'].str.strip()
 
-    # Fetch and merge team stats by year
-    print("Fetching team stats by year...")
-    team_stats_by_year = {season: get_team_stats_by_year(season) for season in seasons}
-    team_stats_df = pd.concat([pd.DataFrame(stats).assign(season=year) for year, stats in team_stats_by_year.items()])
+    # Merge team stats for the affected seasons
+    team_stats_df = pd.concat([pd.DataFrame(get_team_stats_by_year(season)).assign(season=season) for season in seasons])
 
     # Clean column names
     team_stats_df.rename(columns={
@@ -132,33 +106,97 @@ if not advanced_df.empty and not totals_df.empty:
         how='left'
     )
     filtered_players['playerName'] = filtered_players['playerName'].str.replace('*', '', regex=False).str.strip()
-
-
-    # Save the final dataset
-    filtered_players.to_csv("nba_player_stats.csv", index=False)
-    print("Final dataset saved to 'nba_player_stats.csv'")
-else:
-    print("One or both player DataFrames (advanced/totals) are empty. Cannot proceed.")
-
-
-
-# Load the player stats CSV (assuming it's already saved locally)
-player_stats = pd.read_csv("nba_player_stats.csv")
-
-# Load the league and top 20 averages CSV
-averages = pd.read_csv("league_avgs.csv")
-
-# Add columns for the scores
-for stat, avg_stat in [("PPG", "Top 20 PPG Avg"), ("APG", "Top 20 APG Avg"), ("RPG", "Top 20 RPG Avg"),
-                       ("SPG", "Top 20 SPG Avg"), ("BPG", "Top 20 BPG Avg"), ("eFG%", "Top 20 eFG% Avg")]:
-    # Map the average stats to the corresponding season
-    averages_dict = averages.set_index("Season")[avg_stat].to_dict()
-    player_stats[f"{stat}_Score"] = player_stats.apply(
-        lambda row: row[stat] / averages_dict[row["season"]] if row["season"] in averages_dict else None,
-        axis=1
-    )
-
-# Save the updated DataFrame
-player_stats.to_csv("nba_player_stats_with_scores.csv", index=False)
-
-print("Scores added and saved to 'nba_player_stats_with_scores.csv'")
+    return filtered_players
+
+
+def replace_seasons(existing, rows, seasons, season_column='season'):
+    # Drop the affected seasons from the existing table and append their new rows
+    if existing is None or existing.empty:
+        return rows.reset_index(drop=True)
+    keep = ~existing[season_column].astype(str).isin({str(season) for season in seasons})
+    merged = pd.concat([existing[keep], rows], ignore_index=True)
+    order = merged[season_column].astype(str).str[:4].astype(int)
+    return merged.iloc[order.argsort(kind='stable')].reset_index(drop=True)
+
+
+def retry_empty(entry, now=None):
+    # An empty answer may have been a transient outage, so it only holds for EMPTY_RETRY_DAYS
+    try:
+        updated_at = calendar.timegm(time.strptime(entry['updated_at'], TIME_FORMAT))
+    except (KeyError, TypeError, ValueError):
+        return True
+    return (time.time() if now is None else now) - updated_at >= EMPTY_RETRY_DAYS * 86400
+
+
+def stale_seasons(seasons, manifest, existing, full=False):
+    # Missing seasons, the in-progress (latest) season and empty seasons past
+    # their retry age are re-fetched
+    if full or existing is None:
+        return list(seasons)
+    present = set(existing['season'].astype(int))
+    current = max(seasons)
+    return [
+        season for season in seasons
+        if str(season) not in manifest
+        or (season not in present and (not manifest[str(season)].get('empty') or retry_empty(manifest[str(season)])))
+        or season == current
+    ]
+
+
+def refresh(first_season=FIRST_SEASON, last_season=LAST_SEASON, full=False):
+    seasons = list(range(first_season, last_season))
+    manifest = load_manifest()
+    existing = pd.read_csv(PLAYER_STATS_FILE) if os.path.exists(PLAYER_STATS_FILE) else None
+
+    stale = stale_seasons(seasons, manifest, existing, full)
+    print(f"Fetching advanced and totals data for seasons {stale}...")
+    player_data = fetch_player_data(stale)
+
+    changed, advanced_stats, totals_stats = [], [], []
+    for season in stale:
+        advanced, totals = player_data[season]
+        if not advanced or not totals:
+            # Remembered so a season nbaapi doesn't have isn't re-fetched every run (only every EMPTY_RETRY_DAYS)
+            print(f"No data returned for season {season}; keeping the existing rows.")
+            manifest[str(season)] = {'hash': None, 'empty': True, 'updated_at': time.strftime(TIME_FORMAT, time.gmtime())}
+            continue
+
+        digest = season_hash(advanced, totals)
+        if manifest.get(str(season), {}).get('hash') == digest and not full:
+            continue
+        changed.append(season)
+        advanced_stats.extend(advanced)
+        totals_stats.extend(totals)
+        manifest[str(season)] = {'hash': digest, 'updated_at': time.strftime(TIME_FORMAT, time.gmtime())}
+
+    if not changed:
+        write_atomic(MANIFEST_FILE, lambda path: write_json(path, manifest))
+        print("All seasons are up to date.")
+        return []
+
+    # Recompute derived columns for the changed seasons only and merge them in
+    rows = build_season_rows(changed, advanced_stats, totals_stats)
+    player_stats = replace_seasons(existing, rows, changed)
+    write_atomic(PLAYER_STATS_FILE, lambda path: player_stats.to_csv(path, index=False))
+
+    averages = pd.read_csv(AVERAGES_FILE)
+    scored_rows = add_score_columns(rows, averages)
+    existing_scores = pd.read_csv(SCORES_FILE) if os.path.exists(SCORES_FILE) and not full else None
+    changed_labels = scored_rows['season'].unique() if not scored_rows.empty else []
+    scores = replace_seasons(existing_scores, scored_rows, changed_labels)
+    write_atomic(SCORES_FILE, lambda path: scores.to_csv(path, index=False))
+
+    write_atomic(MANIFEST_FILE, lambda path: write_json(path, manifest))
+    print(f"Updated seasons {changed}; saved {PLAYER_STATS_FILE} and {SCORES_FILE}")
+    return changed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Refresh nba_player_stats.csv from nbaapi.")
+    parser.add_argument('--first', type=int, default=FIRST_SEASON)
+    parser.add_argument('--last', type=int, default=LAST_SEASON, help="exclusive, like range()")
+    parser.add_argument('--full', action='store_true', help="re-fetch and rebuild every season")
+    args = parser.parse_args()
+    # Two refreshes at once would each rewrite the CSVs from a stale copy
+    with file_lock(MANIFEST_FILE):
+        refresh(args.first, args.last, args.full)
@@ -0,0 +1,77 @@
+import os
+import sys
+import hashlib
+import io
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculations.mvp_calculations import get_all_mvps, normalize_name
+from calculations.cache_manager import backend_path, get_cache
+
+# The model's inputs as plain arrays, built from the local player-season CSV
+# once and kept as an .npz in checkpoints/features, a cache directory of its own
+# so its budget and stats stay apart from prepare.py's season checkpoints. The
+# cache key hashes the CSV and the feature list, so editing either rebuilds it;
+# nothing here touches the network.
+FEATURES = ["PPG", "APG", "RPG", "SPG", "winShares", "per", "usagePercent"]  # as in model_evaluation.ipynb
+SOURCE_FILE = backend_path("data", "nba_player_stats_with_scores.csv")
+FEATURE_DIR = backend_path("modeling", "checkpoints", "features")
+
+feature_cache = get_cache('features', FEATURE_DIR)
+
+
+def feature_key(source=SOURCE_FILE, features=FEATURES):
+    digest = hashlib.sha1()
+    with open(source, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    digest.update(','.join(features).encode())
+    return f"features-{digest.hexdigest()[:16]}.npz"
+
+
+def season_years(labels):
+    # evaluate.py labels the nba_api season ending in x as "x-(x+1)", so the
+    # first four digits are the year the MVP was awarded
+    return pd.Series(labels).astype(str).str[:4].astype(int).to_numpy()
+
+
+def build_feature_matrix(source=SOURCE_FILE, features=FEATURES):
+    data = pd.read_csv(source)
+    seasons = season_years(data['season'])
+
+    # The MVP column in the committed CSVs predates the name fix in evaluate.py,
+    # so the label comes from the award history (and the column, where it is set)
+    mvps = get_all_mvps()
+    winners = pd.Series(seasons.astype(str)).map(mvps)
+    is_mvp = data['playerName'].map(normalize_name).to_numpy() == winners.to_numpy()
+    if 'MVP' in data:
+        is_mvp |= data['MVP'].fillna(0).to_numpy() == 1
+
+    X = data[features].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    keep = ~np.isnan(X).any(axis=1)
+    return {
+        'X': X[keep],
+        'y': is_mvp[keep].astype(np.int8),
+        'season': seasons[keep],
+        'player': np.asarray(data['playerName'].astype(str).tolist())[keep],
+        'features': np.array(features),
+    }
+
+
+def load_feature_matrix(source=SOURCE_FILE, features=FEATURES, refresh=False):
+    # -> path of the cached .npz; the first caller builds it, concurrent callers wait
+    key = feature_key(source, features)
+    if refresh or not feature_cache.is_fresh(key):
+        with feature_cache.lock(key):
+            if refresh or not feature_cache.is_fresh(key):
+                buffer = io.BytesIO()
+                np.savez(buffer, **build_feature_matrix(source, features))
+                feature_cache.write(key, buffer.getvalue())
+    return feature_cache.path(key)
+
+
+def read_feature_matrix(path):
+    with np.load(path) as arrays:
+        return {name: arrays[name] for name in arrays.files}
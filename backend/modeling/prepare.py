@@ -1,43 +1,90 @@
+import os
+import sys
+import hashlib
+import io
 import pandas as pd
-from calculations.team_stats import fetch_team_stats, get_team
-from calculations.player_stats import get_filtered_player_data, get_mvp_data
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from calculations.team_stats import get_team_stats_by_year
+from calculations.threshold_index import get_threshold_index
+from calculations.scoring import join_teams
+from calculations.mvp_calculations import get_all_mvps, normalize_name
+from calculations.cache_manager import get_cache, season_ttl
+
+# Seasons are built concurrently and each finished season is checkpointed, so a
+# crash or a run of 429s resumes where it stopped instead of starting over.
+CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "checkpoints")
+checkpoint_cache = get_cache('checkpoints', CHECKPOINT_DIR)
+MAX_WORKERS = 8
+SEASON_COLUMNS = ['Year', 'Player', 'PTS', 'AST', 'TRB', 'eFG%', 'Wins', 'Rank']
+
+
+def checkpoint_key(year, lwr_points, lwr_gs, lwr_efg):
+    params = hashlib.sha256(f"{lwr_points}|{lwr_gs}|{lwr_efg}".encode('utf-8')).hexdigest()[:8]
+    return f"season_{year}_{params}.csv"
+
+
+def build_season(year, lwr_points, lwr_gs, lwr_efg):
+    # One season's rows: filtered players joined to the standings in one step
+    all_teams = get_team_stats_by_year(year)
+    filtered_player_data = get_threshold_index(year).filter(lwr_points, lwr_gs, lwr_efg)
+    players, _, wins, rank = join_teams(filtered_player_data, all_teams)
+
+    return pd.DataFrame({
+        'Year': year,
+        'Player': players['Player'].to_numpy(),
+        'PTS': pd.to_numeric(players['PTS'], errors='coerce').to_numpy(),
+        'AST': pd.to_numeric(players['AST'], errors='coerce').to_numpy(),
+        'TRB': pd.to_numeric(players['TRB'], errors='coerce').to_numpy(),
+        'eFG%': pd.to_numeric(players['eFG%'], errors='coerce').to_numpy(),
+        'Wins': wins,
+        'Rank': rank,
+    }, columns=SEASON_COLUMNS)
+
+
+def load_or_build_season(year, lwr_points, lwr_gs, lwr_efg):
+    # The season in progress is rebuilt once its checkpoint goes stale
+    key = checkpoint_key(year, lwr_points, lwr_gs, lwr_efg)
+    content = checkpoint_cache.read(key, season_ttl(year))
+    if content is not None:
+        return pd.read_csv(io.StringIO(content))
+
+    season = build_season(year, lwr_points, lwr_gs, lwr_efg)
+    checkpoint_cache.write(key, season.to_csv(index=False))
+    return season
+
+
+def build_multi_year(start_year, end_year, lwr_points=15, lwr_gs=50, lwr_efg=0.4, max_workers=MAX_WORKERS):
+    years = list(range(start_year, end_year + 1))
+    seasons = {}
+
+    # Upstream politeness is enforced by the shared fetch layer's rate limiter
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(years))) as executor:
+        futures = {
+            executor.submit(load_or_build_season, year, lwr_points, lwr_gs, lwr_efg): year
+            for year in years
+        }
+        for future in as_completed(futures):
+            year = futures[future]
+            try:
+                seasons[year] = future.result()
+            except Exception as e:
+                print(f"Error processing year {year}: {e}")
+
+    frames = [seasons[year] for year in years if year in seasons]
+    if not frames:
+        return pd.DataFrame(columns=SEASON_COLUMNS + ['MVP'])
+    data = pd.concat(frames, ignore_index=True)
+
+    # Label every season's MVP in one vectorized pass
+    mvps = get_all_mvps()
+    data['MVP'] = (data['Player'].map(normalize_name) == data['Year'].astype(str).map(mvps)).astype(int)
+    return data
+
 
 def prepare_clean_multi_year(start_year, end_year, lwr_points=15, lwr_gs=50, lwr_efg=0.4):
-    all_rows = []
-
-    for year in range(start_year, end_year + 1):
-        # Fetch data for the year
-        try:
-            all_teams = fetch_team_stats(year)
-            filtered_player_data, mvp = get_filtered_player_data(year, lwr_points, lwr_gs, lwr_efg)
-            
-            # Parse data for each player
-            for name in filtered_player_data['Player']:
-                player = get_mvp_data(filtered_player_data, name)
-                if player is None:
-                    continue
-
-                player_team = get_team(all_teams, str(player[2]))
-                if not player_team:
-                    continue
-
-                # Add player and team data into a row
-                all_rows.append({
-                    'Year': year,
-                    'Player': name,
-                    'PTS': player[28],
-                    'AST': player[23],
-                    'TRB': player[22],
-                    'eFG%': player[16],
-                    'Wins': player_team['Wins'],
-                    'Rank': player_team['Rank'],
-                    'MVP': 1 if mvp and name == mvp else 0  # Handle missing MVP
-                })
-        except Exception as e:
-            print(f"Error processing year {year}: {e}")
-
-    # Create a DataFrame
-    data = pd.DataFrame(all_rows)
+    data = build_multi_year(start_year, end_year, lwr_points, lwr_gs, lwr_efg)
 
     # Balance the dataset: Ensure equal or near-equal MVPs and non-MVPs
     mvps = data[data['MVP'] == 1]
@@ -50,3 +97,11 @@ def prepare_clean_multi_year(start_year, end_year, lwr_points=15, lwr_gs=50, lwr
     balanced_data = pd.concat([mvps, non_mvps_sampled]).sample(frac=1, random_state=42).reset_index(drop=True)
 
     return balanced_data
+
+
+if __name__ == '__main__':
+    # Usage: python modeling/prepare.py <start_year> <end_year>
+    first_year = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    last_year = int(sys.argv[2]) if len(sys.argv) > 2 else 2024
+    data = build_multi_year(first_year, last_year)
+    print(f"Built {len(data)} player-seasons for {data['Year'].nunique()} seasons, {int(data['MVP'].sum())} MVPs")
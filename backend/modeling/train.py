@@ -1,91 +1,134 @@
 # Add the root directory (MVPProject) to the Python path
 import sys
 import os
+import argparse
+import json
+import time
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from modeling.prepare import prepare_clean_multi_year
-from sklearn.model_selection import train_test_split
+from modeling.features import load_feature_matrix, read_feature_matrix
+from calculations.mvp_model import MODEL_FILE, MODEL_FORMAT
+from calculations.cache_manager import atomic_write
+from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
-import tensorflow as tf
-from tensorflow.keras import Sequential
-from tensorflow.keras.layers import Dense
-import matplotlib.pyplot as plt
-
-# Prepare the dataset
-data = prepare_clean_multi_year(2000, 2024)
-# print(data)
-# print(data['MVP'].value_counts())  # Check the balance of MVP vs non-MVP
-
-# Define features (X) and target (y)
-X = data[['PTS', 'AST', 'TRB', 'eFG%', 'Wins', 'Rank']]
-y = data['MVP']
-
-# # Split into training and testing sets
-# from sklearn.model_selection import train_test_split
-# from sklearn.preprocessing import StandardScaler
-# import numpy as np
-
-# X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# # Standardize the features
-# scaler = StandardScaler()
-# X_train = scaler.fit_transform(X_train)
-# X_test = scaler.transform(X_test)
-
-# # Convert to NumPy arrays
-# X_train = np.array(X_train)
-# X_test = np.array(X_test)
-# y_train = np.array(y_train)
-# y_test = np.array(y_test)
-
-# # print(f"Training set: {X_train.shape}, Test set: {X_test.shape}")
-
-# # Define the neural network model
-# model = Sequential([
-#     Dense(64, activation='relu', input_shape=(X_train.shape[1],)),  # Input layer with 64 neurons
-#     Dense(32, activation='relu'),  # Hidden layer with 32 neurons
-#     Dense(1, activation='sigmoid')  # Output layer for binary classification (MVP or not)
-# ])
-
-# # Print model summary
-# # print(model.summary())
-
-# # Compile the model
-# model.compile(
-#     optimizer='adam',
-#     loss='binary_crossentropy',  # Loss function for binary classification
-#     metrics=['accuracy']  # Track accuracy during training
-# )
-
-# # Train the model
-# history = model.fit(
-#     X_train, y_train,
-#     validation_data=(X_test, y_test),
-#     epochs=50,  # Number of training epochs
-#     batch_size=16  # Number of samples per batch
-# )
-
-# # Evaluate the model
-# test_loss, test_accuracy = model.evaluate(X_test, y_test)
-# print(f"Test Loss: {test_loss:.4f}")
-# print(f"Test Accuracy: {test_accuracy:.4f}")
-
-# # Plot training and validation accuracy
-# plt.plot(history.history['accuracy'], label='Training Accuracy')
-# plt.plot(history.history['val_accuracy'], label='Validation Accuracy')
-# plt.xlabel('Epochs')
-# plt.ylabel('Accuracy')
-# plt.legend()
-# plt.title('Training and Validation Accuracy')
-# plt.show()
-
-# # Plot training and validation loss
-# plt.plot(history.history['loss'], label='Training Loss')
-# plt.plot(history.history['val_loss'], label='Validation Loss')
-# plt.xlabel('Epochs')
-# plt.ylabel('Loss')
-# plt.legend()
-# plt.title('Training and Validation Loss')
-# plt.show()
+
+# Leave-one-season-out evaluation of the MVP model from model_evaluation.ipynb
+# (StandardScaler + balanced LogisticRegression). Each season is held out in
+# turn, the model is fit on the others, and the season's players are ranked by
+# predicted probability: a hit is the real MVP landing at 1 (top-1) or in the
+# first three (top-3). Folds run in worker processes that each load the cached
+# feature matrix once. Nothing here scrapes; the old TensorFlow network is gone.
+# --export fits on every season and writes the artifact /predict serves.
+
+TOP_K = (1, 3)
+
+_matrix = None
+
+
+def _load_worker(path):
+    global _matrix
+    _matrix = read_feature_matrix(path)
+
+
+def fit_model(X, y):
+    scaler = StandardScaler()
+    model = LogisticRegression(class_weight="balanced", max_iter=1000)
+    model.fit(scaler.fit_transform(X), y)
+    return scaler, model
+
+
+def mvp_rank(probabilities, y):
+    # 1-based position of the MVP when the season is sorted by probability (ties count against it)
+    mvp_probability = probabilities[y == 1].max()
+    return int((probabilities >= mvp_probability).sum())
+
+
+def evaluate_season(season):
+    X, y, seasons, players = _matrix['X'], _matrix['y'], _matrix['season'], _matrix['player']
+    held_out = seasons == season
+    scaler, model = fit_model(X[~held_out], y[~held_out])
+    probabilities = model.predict_proba(scaler.transform(X[held_out]))[:, 1]
+
+    season_y = y[held_out]
+    rank = mvp_rank(probabilities, season_y)
+    return {
+        'season': int(season),
+        'mvp': str(players[held_out][season_y == 1][0]),
+        'predicted': str(players[held_out][probabilities.argmax()]),
+        'rank': rank,
+        **{f'top{k}': rank <= k for k in TOP_K},
+    }
+
+
+def labelled_seasons(matrix):
+    # Seasons whose MVP is in the data; the rest can be scored but not held out
+    return sorted(int(season) for season in np.unique(matrix['season'][matrix['y'] == 1]))
+
+
+def leave_one_season_out(path, workers=None):
+    matrix = read_feature_matrix(path)
+    seasons = labelled_seasons(matrix)
+    workers = min(workers or os.cpu_count() or 1, len(seasons))
+    if workers <= 1:
+        _load_worker(path)
+        return [evaluate_season(season) for season in seasons]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_load_worker, initargs=(path,)) as pool:
+        return list(pool.map(evaluate_season, seasons))
+
+
+def export_model(path, output=MODEL_FILE):
+    matrix = read_feature_matrix(path)
+    X, y = matrix['X'], matrix['y']
+    scaler, model = fit_model(X, y)
+
+    # class_weight="balanced" scales the MVP odds by n_other / n_mvp; taking that
+    # back out of the intercept makes the probabilities match the real base rate
+    positives = int(y.sum())
+    intercept = float(model.intercept_[0]) - np.log((len(y) - positives) / positives)
+    # Versioned by training date and the feature matrix it was fit on ("features-<hash>.npz")
+    matrix_hash = os.path.splitext(os.path.basename(path))[0].split('-', 1)[1]
+    artifact = {
+        'format': MODEL_FORMAT,
+        'version': f"{time.strftime('%Y%m%d')}-{matrix_hash}",
+        'features': [str(feature) for feature in matrix['features']],
+        'coef': model.coef_[0].tolist(),
+        'intercept': intercept,
+        'scaler_mean': scaler.mean_.tolist(),
+        'scaler_scale': scaler.scale_.tolist(),
+        'seasons': labelled_seasons(matrix),
+        'rows': int(len(y)),
+    }
+    atomic_write(output, json.dumps(artifact, indent=2))
+    return artifact
+
+
+def hit_rates(results):
+    return {f'top{k}': float(np.mean([result[f'top{k}'] for result in results])) for k in TOP_K}
+
+
+if __name__ == '__main__':
+    # Usage: python modeling/train.py [--workers N] [--refresh] [--export]
+    parser = argparse.ArgumentParser(description="Leave-one-season-out evaluation of the MVP model.")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument('--refresh', action='store_true', help="rebuild the cached feature matrix")
+    parser.add_argument('--export', action='store_true', help=f"fit on every season and write {MODEL_FILE}")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    path = load_feature_matrix(refresh=args.refresh)
+    results = leave_one_season_out(path, args.workers)
+
+    for result in results:
+        marker = 'top-1' if result['top1'] else 'top-3' if result['top3'] else ''
+        print(f"{result['season']}  MVP {result['mvp']:<28} rank {result['rank']:>3}  "
+              f"predicted {result['predicted']:<28} {marker}")
+    rates = hit_rates(results)
+    print(f"{len(results)} seasons: top-1 {rates['top1']:.0%}, top-3 {rates['top3']:.0%} "
+          f"({time.perf_counter() - start:.2f}s)")
+
+    if args.export:
+        artifact = export_model(path)
+        print(f"Wrote model {artifact['version']} to {MODEL_FILE}")
@@ -1,62 +1,140 @@
-from nba_api.stats.static import players, teams
-from nba_api.stats.endpoints import commonteamroster, playergamelog
+from nba_api.stats.static import teams
+from nba_api.stats.endpoints import commonteamroster, leaguegamelog, playergamelog
 import pandas as pd
 from concurrent.futures import ThreadPoolExecutor
+import argparse
 import os
-import json
-import time
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from calculations import fetch
+from calculations.game_log_store import get_store
+from calculations.cache_manager import season_ttl
 
 desired_season = "2022-23"
-cache_dir = "cache"
-os.makedirs(cache_dir, exist_ok=True)
+ROLLING_WINDOW = 10
+
+
+class NbaStatsClient:
+    # Every stats.nba.com call made by this script, behind one rate limiter.
+    # Tests and offline runs can pass any object with the same methods instead.
+
+    def __init__(self, rate=None):
+        self.bucket = fetch.TokenBucket(*(rate or fetch.HOST_RATES['stats.nba.com']))
+        self.calls = 0
+
+    def _call(self, endpoint, **kwargs):
+        self.bucket.acquire()
+        self.calls += 1
+        return endpoint(**kwargs).get_data_frames()[0]
+
+    def league_game_log(self, season):
+        # Every player's every game of the season, in one request
+        return self._call(leaguegamelog.LeagueGameLog, season=season, player_or_team_abbreviation='P')
+
+    def team_roster(self, team_id, season):
+        return self._call(commonteamroster.CommonTeamRoster, team_id=team_id, season=season)
+
+    def player_game_log(self, player_id, season):
+        return self._call(playergamelog.PlayerGameLog, player_id=player_id, season=season)
+
+
+def season_end_year(season):
+    # "2022-23" -> 2023, the year season_ttl and the other season caches use
+    return int(str(season)[:4]) + 1
+
+
+# Bulk mode: one league game log per season, kept columnar in the game-log store;
+# the season in progress is re-fetched once its log is older than its TTL
+def load_league_game_log(season, client=None, refresh=False):
+    store = get_store()
+    logs = None if refresh else store.get_league_log(season, season_ttl(season_end_year(season)))
+    if logs is None:
+        logs = (client or NbaStatsClient()).league_game_log(season)
+        store.put_league_log(season, logs)
+    return logs
+
 
-# Step 1: Fetch active players
-def get_active_players(season):
+def player_aggregates(logs, window=ROLLING_WINDOW):
+    # Season and last-`window`-games averages for every player, from grouped passes over the log
+    logs = logs.sort_values(['PLAYER_ID', 'GAME_DATE'], kind='stable')
+    aggregates = logs.groupby('PLAYER_ID').agg(**{
+        'Player Name': ('PLAYER_NAME', 'last'),
+        'GP': ('PTS', 'size'),
+        'PPG': ('PTS', 'mean'),
+        'APG': ('AST', 'mean'),
+        'RPG': ('REB', 'mean'),
+    })
+    recent = logs.groupby('PLAYER_ID').tail(window).groupby('PLAYER_ID')[['PTS', 'AST']].mean()
+    aggregates[f'PPG Last {window}'] = recent['PTS']
+    aggregates[f'APG Last {window}'] = recent['AST']
+    return aggregates.reset_index()
+
+
+def top_scorers(season, n=10, client=None, refresh=False):
+    aggregates = player_aggregates(load_league_game_log(season, client, refresh))
+    return aggregates.sort_values(by='PPG', ascending=False).head(n)
+
+
+# Per-player mode: rosters, then one game log per player (kept for players the
+# league log does not cover)
+def get_active_players(season, client=None):
+    client = client or NbaStatsClient()
     active_players = []
     nba_teams = teams.get_teams()
 
     for team in nba_teams:
         try:
-            roster = commonteamroster.CommonTeamRoster(team_id=team['id'], season=season)
-            roster_df = roster.get_data_frames()[0]
+            roster_df = client.team_roster(team['id'], season)
             active_players.extend(roster_df[['PLAYER_ID', 'PLAYER']].to_dict('records'))
         except Exception as e:
             print(f"Error fetching roster for {team['full_name']}: {e}")
 
     return active_players
 
-# Step 2: Fetch game logs with caching
-def fetch_game_log(player):
+def fetch_game_log(player, season=desired_season, client=None):
     try:
-        game_log = playergamelog.PlayerGameLog(player_id=player['PLAYER_ID'], season=desired_season)
-        game_log_df = game_log.get_data_frames()[0]
-        avg_ppg = game_log_df['PTS'].mean()
-
-        return {'Player Name': player['PLAYER'], 'PPG': avg_ppg}
+        records = (client or NbaStatsClient()).player_game_log(player['PLAYER_ID'], season).to_dict('records')
+        get_store().put(player['PLAYER_ID'], season, records)  # empty logs are negative-cached
+        return records
     except Exception as e:
         print(f"Error fetching data for {player['PLAYER']}: {e}")
         return None
 
-def fetch_cached_or_live(player):
-    cache_file = os.path.join(cache_dir, f"{player['PLAYER_ID']}.json")
-    if os.path.exists(cache_file):
-        with open(cache_file, 'r') as f:
-            return json.load(f)
-    result = fetch_game_log(player)
-    if result:
-        with open(cache_file, 'w') as f:
-            json.dump(result, f)
-    return result
-
-# Step 3: Use ThreadPoolExecutor for parallelization
-active_players = get_active_players(desired_season)
-with ThreadPoolExecutor(max_workers=10) as executor:
-    results = list(executor.map(fetch_cached_or_live, active_players))
-
-# Step 4: Filter and analyze data
-player_data = [result for result in results if result]
-player_data_df = pd.DataFrame(player_data)
-top_10_players_df = player_data_df.sort_values(by='PPG', ascending=False).head(10)
-
-# Display results
-print(top_10_players_df)
+def player_ppg(player, records):
+    if not records:
+        return None
+    return {'Player Name': player['PLAYER'], 'PPG': pd.DataFrame(records)['PTS'].mean()}
+
+def top_scorers_per_player(season, n=10, client=None):
+    client = client or NbaStatsClient()
+    active_players = get_active_players(season, client)
+    # One read for every stored log of the season; only the misses go upstream
+    season_logs = get_store().get_season(season)
+    missing = [player for player in active_players if player['PLAYER_ID'] not in season_logs]
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        for player, records in zip(missing, executor.map(lambda player: fetch_game_log(player, season, client), missing)):
+            season_logs[player['PLAYER_ID']] = records
+    results = [player_ppg(player, season_logs.get(player['PLAYER_ID'])) for player in active_players]
+
+    player_data = [result for result in results if result]
+    player_data_df = pd.DataFrame(player_data)
+    return player_data_df.sort_values(by='PPG', ascending=False).head(n)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Top scorers of a season")
+    parser.add_argument('--season', default=desired_season)
+    parser.add_argument('--mode', choices=['bulk', 'per-player'], default='bulk')
+    parser.add_argument('--refresh', action='store_true', help="re-download the season's league game log")
+    args = parser.parse_args()
+
+    client = NbaStatsClient()
+    if args.mode == 'bulk':
+        top_10_players_df = top_scorers(args.season, client=client, refresh=args.refresh)
+    else:
+        top_10_players_df = top_scorers_per_player(args.season, client=client)
+
+    # Display results
+    print(top_10_players_df)
+    print(f"{client.calls} stats.nba.com requests")
@@ -0,0 +1,196 @@
+# Add the root directory (MVPProject) to the Python path
+import sys
+import os
+import argparse
+import hashlib
+import io
+import json
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculations.player_stats import load_season_inputs, rank_player_data
+from calculations.scoring import join_teams, term_matrix, TERM_NAMES, LEGACY_WEIGHTS, WEIGHTS_FILE
+from calculations.mvp_calculations import normalize_name
+from calculations.season_store import season_version
+from calculations.cache_manager import atomic_write
+from modeling.features import feature_cache
+
+# Searches calculate_score's weights against every season at once. Each
+# season's filtered players (same thresholds and team join as /result) become
+# rows of one (players, term) matrix; a block of candidate weight vectors is a
+# (term, candidate) matrix, so one product scores every player under every
+# candidate. A candidate's hit rate is how often the real MVP comes out first
+# (top-1) or in the first three (top-3) of their season. Blocks of candidates
+# run in worker processes, and the best weights are exported to WEIGHTS_FILE.
+# Only the score's ranking matters, so candidates are normalized to sum to 1
+# (the legacy weights already do).
+BLOCK_SIZE = 512
+DEFAULT_CANDIDATES = 4096
+DEFAULT_ROUNDS = 3
+
+_terms = None
+
+
+def term_key(years, lwr_points, lwr_efg, lwr_gs):
+    versions = ','.join(str(season_version(year)) for year in years)
+    digest = hashlib.sha1(f"{years}|{lwr_points}|{lwr_efg}|{lwr_gs}|{versions}".encode()).hexdigest()[:16]
+    return f"terms-{years[0]}-{years[-1]}-{digest}.npz"
+
+
+def season_terms(year, lwr_points, lwr_efg, lwr_gs):
+    all_teams, index, mvp = load_season_inputs(year)
+    players = join_teams(rank_player_data(index.filter(lwr_points, lwr_gs, lwr_efg)), all_teams)[0]
+    names = [normalize_name(name) for name in players['Player']]
+    return term_matrix(players), np.array([name == normalize_name(mvp) for name in names])
+
+
+def build_term_matrix(years, lwr_points=15.0, lwr_efg=0.4, lwr_gs=50):
+    # Rows grouped by season; seasons whose MVP is not among the filtered players are left out
+    terms, mvp_rows, starts, kept = [], [], [], []
+    offset = 0
+    for year in years:
+        try:
+            season, is_mvp = season_terms(year, lwr_points, lwr_efg, lwr_gs)
+        except Exception as e:
+            print(f"Skipping {year}: {e}")
+            continue
+        if not is_mvp.any():
+            print(f"Skipping {year}: MVP not in the filtered players")
+            continue
+        terms.append(season)
+        starts.append(offset)
+        mvp_rows.append(offset + int(np.argmax(is_mvp)))
+        kept.append(year)
+        offset += len(season)
+    if not terms:
+        raise RuntimeError("No seasons with an MVP to evaluate")
+    return {
+        'terms': np.vstack(terms),
+        'starts': np.array(starts),
+        'mvp_rows': np.array(mvp_rows),
+        'years': np.array(kept),
+    }
+
+
+def load_term_matrix(years, lwr_points=15.0, lwr_efg=0.4, lwr_gs=50, refresh=False):
+    # -> path of the cached .npz, built once per set of seasons, thresholds and season versions
+    key = term_key(list(years), lwr_points, lwr_efg, lwr_gs)
+    if refresh or not feature_cache.is_fresh(key):
+        with feature_cache.lock(key):
+            if refresh or not feature_cache.is_fresh(key):
+                buffer = io.BytesIO()
+                np.savez(buffer, **build_term_matrix(list(years), lwr_points, lwr_efg, lwr_gs))
+                feature_cache.write(key, buffer.getvalue())
+    return feature_cache.path(key)
+
+
+def _load_worker(path):
+    global _terms
+    with np.load(path) as arrays:
+        _terms = {name: arrays[name] for name in arrays.files}
+
+
+def mvp_ranks(terms, starts, mvp_rows, weights):
+    # (season, candidate) rank of each season's MVP: 1 + players scoring strictly higher
+    scores = terms @ weights
+    season_of_row = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(terms))))
+    higher = scores > scores[mvp_rows][season_of_row]
+    return 1 + np.add.reduceat(higher, starts, axis=0, dtype=np.int64)
+
+
+def evaluate_block(weights):
+    ranks = mvp_ranks(_terms['terms'], _terms['starts'], _terms['mvp_rows'], weights)
+    return (ranks == 1).mean(axis=0), (ranks <= 3).mean(axis=0), ranks.mean(axis=0)
+
+
+def candidates(count, rng, center=None, concentration=1.0):
+    # Dirichlet samples: uniform over the simplex, or clustered around `center` as concentration grows
+    alpha = np.ones(len(TERM_NAMES)) if center is None else np.maximum(center * concentration, 1e-3)
+    return rng.dirichlet(alpha, size=count).T
+
+
+def evaluate(path, weights, workers=None):
+    blocks = [weights[:, i:i + BLOCK_SIZE] for i in range(0, weights.shape[1], BLOCK_SIZE)]
+    workers = min(workers or os.cpu_count() or 1, len(blocks))
+    if workers <= 1:
+        _load_worker(path)
+        results = [evaluate_block(block) for block in blocks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_load_worker, initargs=(path,)) as pool:
+            results = list(pool.map(evaluate_block, blocks))
+    top1, top3, mean_rank = (np.concatenate(parts) for parts in zip(*results))
+    return top1, top3, mean_rank
+
+
+def best_index(top1, top3, mean_rank):
+    # Most top-1 hits, then most top-3 hits, then the lowest average MVP rank
+    return int(np.lexsort((mean_rank, -top3, -top1))[0])
+
+
+def search(path, count=DEFAULT_CANDIDATES, rounds=DEFAULT_ROUNDS, workers=None, seed=0):
+    # The first round samples the whole simplex (plus the legacy weights); later
+    # rounds sample more and more tightly around the best candidate so far
+    rng = np.random.default_rng(seed)
+    legacy = np.array([LEGACY_WEIGHTS[name] for name in TERM_NAMES])
+    best = None
+    for round_number in range(rounds):
+        if best is None:
+            weights = np.column_stack([legacy, candidates(count - 1, rng)])
+        else:
+            weights = np.column_stack([best['vector'], candidates(count - 1, rng, best['vector'], 50.0 * 4 ** round_number)])
+        top1, top3, mean_rank = evaluate(path, weights, workers)
+        i = best_index(top1, top3, mean_rank)
+        best = {'vector': weights[:, i], 'top1': float(top1[i]), 'top3': float(top3[i]), 'mean_rank': float(mean_rank[i])}
+        if round_number == 0:
+            baseline = {'top1': float(top1[0]), 'top3': float(top3[0]), 'mean_rank': float(mean_rank[0])}
+        print(f"round {round_number + 1}: {weights.shape[1]} candidates, best top-1 {best['top1']:.0%}, top-3 {best['top3']:.0%}")
+    return best, baseline
+
+
+def export_weights(best, years, thresholds, output=WEIGHTS_FILE):
+    config = {
+        'weights': {name: round(float(weight), 4) for name, weight in zip(TERM_NAMES, best['vector'])},
+        'top1': best['top1'],
+        'top3': best['top3'],
+        'mean_rank': best['mean_rank'],
+        'seasons': [int(year) for year in years],
+        'thresholds': dict(zip(['lwr_points', 'lwr_efg', 'lwr_gs'], thresholds)),
+        'created': time.strftime('%Y-%m-%d'),
+    }
+    atomic_write(output, json.dumps(config, indent=2))
+    return config
+
+
+if __name__ == '__main__':
+    # Usage: python modeling/weight_search.py 2000 2024 [--candidates 4096] [--rounds 3] [--workers N] [--export]
+    parser = argparse.ArgumentParser(description="Search calculate_score weights against every season's MVP.")
+    parser.add_argument('first', type=int, help="first season (end year)")
+    parser.add_argument('last', type=int, help="last season, inclusive")
+    parser.add_argument('--lwr_points', type=float, default=15.0)
+    parser.add_argument('--lwr_efg', type=float, default=40, help="percent, as in /result")
+    parser.add_argument('--lwr_gs', type=int, default=50)
+    parser.add_argument('--candidates', type=int, default=DEFAULT_CANDIDATES, help="weight vectors per round")
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--refresh', action='store_true', help="rebuild the cached term matrix")
+    parser.add_argument('--export', action='store_true', help=f"write the best weights to {WEIGHTS_FILE}")
+    args = parser.parse_args()
+
+    thresholds = (args.lwr_points, args.lwr_efg * 0.01, args.lwr_gs)
+    start = time.perf_counter()
+    path = load_term_matrix(range(args.first, args.last + 1), *thresholds, refresh=args.refresh)
+    with np.load(path) as arrays:
+        years = arrays['years']
+    best, baseline = search(path, args.candidates, args.rounds, args.workers, args.seed)
+
+    print(f"{len(years)} seasons, {time.perf_counter() - start:.2f}s")
+    print(f"legacy weights: top-1 {baseline['top1']:.0%}, top-3 {baseline['top3']:.0%}, mean MVP rank {baseline['mean_rank']:.2f}")
+    print(f"best weights:   top-1 {best['top1']:.0%}, top-3 {best['top3']:.0%}, mean MVP rank {best['mean_rank']:.2f}")
+    print(dict(zip(TERM_NAMES, np.round(best['vector'], 4))))
+    if args.export:
+        export_weights(best, years, thresholds)
+        print(f"Wrote {WEIGHTS_FILE}")
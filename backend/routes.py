@@ -1,55 +1,306 @@
-from flask import request, redirect, url_for, jsonify, send_from_directory
+from flask import request, redirect, url_for, jsonify, send_from_directory, Response, stream_with_context, g
+import json
 import os
 import sys
+import time
+import zlib
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from calculations.player_stats import get_filtered_player_data, get_mvp_data, calculate_score
-from calculations.team_stats import get_team_stats_by_year, get_team
+from calculations.player_stats import load_season_inputs, rank_player_data, season_inputs_version
+from calculations.scoring import rank_season
+from calculations.single_flight import flights
+from calculations.result_cache import result_cache, result_key
+from calculations import fetch, cache_manager, metrics, mvp_model, formulas, shared_tables
+from calculations.metrics import stage
+
+RESULT_FIELDS = ['Year', 'Player', 'MVP Score', 'MVP']
+MAX_SEASONS = 100
+MAX_SWEEP_COMBINATIONS = 100
+
+def parse_grid(value, default, cast, scale=1):
+    # "10,15,20" -> [10.0, 15.0, 20.0]; blank entries fall back to the /result default
+    values = [item.strip() for item in value.split(',')] if value else ['']
+    return [cast(item) * scale if item else default for item in values]
+
+def parse_thresholds(args):
+    lwr_points = args.get('lwr_points', '15')
+    lwr_points = float(lwr_points.strip()) if lwr_points.strip() else 15.0
+
+    lwr_efg = args.get('lwr_efg', '40')
+    lwr_efg = float(lwr_efg.strip()) * 0.01 if lwr_efg.strip() else 0.4
+
+    lwr_gs = args.get('lwr_gs', '50')
+    lwr_gs = int(lwr_gs.strip()) if lwr_gs.strip() else 50
+    return lwr_points, lwr_efg, lwr_gs
+
+def parse_year(value):
+    # ?year= goes into cache file names and upstream URLs; normalized to "2024"
+    return str(cache_manager.season_year(value.strip()))
+
+def parse_years(value):
+    # "2000-2024" or "1999,2005-2007" -> [1999, 2005, 2006, 2007]
+    years = []
+    for part in value.split(','):
+        first, _, last = part.strip().partition('-')
+        first = cache_manager.season_year(first)
+        last = cache_manager.season_year(last) if last else first
+        if last < first or last - first > MAX_SEASONS:
+            raise ValueError(f"bad season range {part.strip()!r}")
+        years.extend(range(first, last + 1))
+    years = list(dict.fromkeys(years))
+    if len(years) > MAX_SEASONS:
+        raise ValueError(f"at most {MAX_SEASONS} seasons per request")
+    return years
+
+def season_result(year, lwr_points, lwr_efg, lwr_gs):
+    # Shares the /result cache and single-flight builds
+    key = result_key(str(year), lwr_points, lwr_efg, lwr_gs, season_inputs_version(year))
+    entry = result_cache.get(key)
+    if entry is None:
+        entry = flights.do(('result',) + key, build_result, str(year), lwr_points, lwr_efg, lwr_gs)
+    return json.loads(entry['body'])
+
+def ndjson_seasons(years, thresholds, fields):
+    # One season in memory at a time; its rows go out as soon as it is ranked
+    for year in years:
+        try:
+            rows = season_result(year, *thresholds)
+        except Exception as e:
+            yield json.dumps({'Year': year, 'error': f"Error processing player stats: {e}"}) + '\n'
+            continue
+        yield ''.join(
+            json.dumps({field: year if field == 'Year' else row[field] for field in fields}) + '\n'
+            for row in rows
+        )
+
+def gzip_stream(chunks):
+    # Sync-flushed after every chunk so each season reaches the client as it finishes
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        yield compressor.compress(chunk.encode('utf-8')) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+def cached_response(request, entry):
+    # 304 when the browser already holds this exact body
+    if request.if_none_match.contains(entry['etag']):
+        response = Response(status=304)
+    else:
+        response = Response(entry['body'], mimetype='application/json')
+    response.set_etag(entry['etag'])
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def build_result(year, lwr_points, lwr_efg, lwr_gs, formula=None):
+    # The season's standings, per-game table and MVP load concurrently
+    formula_key, plan, weights = formulas.resolve(formula)
+    all_teams, index, mvp = load_season_inputs(year)
+    with stage('filter'):
+        filtered_player_data = rank_player_data(index.filter(lwr_points, lwr_gs, lwr_efg))
+
+    # Score the whole season in one pass (same results as the old per-player loop)
+    with stage('score'):
+        unique_result_data = rank_season(filtered_player_data, all_teams, mvp, weights, plan)
+
+    # The season's inputs may have just been fetched, so key on the versions it was built from
+    key = result_key(year, lwr_points, lwr_efg, lwr_gs, season_inputs_version(year), formula_key)
+    with stage('serialize'):
+        body = jsonify(unique_result_data).get_data()
+    return result_cache.put(key, body)
+
+def register_metrics(app):
+    # Stage timings for every request, returned as Server-Timing and kept for /metrics.
+    # With MVP_PROFILING=1 on the server, ?profile=1 returns the request's sampled stacks instead.
+    @app.before_request
+    def start_timing():
+        g.metrics_started = time.perf_counter()
+        g.metrics_token, g.metrics_timings = metrics.begin_request()
+        g.profiler = None
+        if request.args.get('profile') == '1' and metrics.profiling_enabled():
+            g.profiler = metrics.SamplingProfiler().start()
+
+    @app.after_request
+    def finish_timing(response):
+        if 'metrics_started' not in g:
+            return response
+        elapsed = time.perf_counter() - g.metrics_started
+        metrics.end_request(g.metrics_token)
+        metrics.registry.observe('mvp_request_seconds', elapsed,
+                                 endpoint=request.endpoint or 'unknown', status=str(response.status_code))
+        response.headers['Server-Timing'] = metrics.server_timing(g.metrics_timings, elapsed)
+        if g.profiler is not None:
+            profile = g.profiler.stop().collapsed()
+            response = Response(profile, mimetype='text/plain', headers={'Server-Timing': response.headers['Server-Timing']})
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def prometheus_metrics():
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 def register_routes(app):
+    register_metrics(app)
+
     @app.route('/result', methods=['GET'])
     def result():
         team_year_stats = request.args.get('year')
-        lwr_points = request.args.get('lwr_points', '15')
-        lwr_points = float(lwr_points.strip()) if lwr_points.strip() else 15.0
+        if not team_year_stats:
+            return redirect(url_for('index'))
+
+        try:
+            team_year_stats = parse_year(team_year_stats)
+            lwr_points, lwr_efg, lwr_gs = parse_thresholds(request.args)
+        except ValueError as e:
+            return jsonify({"error": f"Invalid parameter: {e}"}), 400
 
-        lwr_efg = request.args.get('lwr_efg', '40')
-        lwr_efg = float(lwr_efg.strip()) * 0.01 if lwr_efg.strip() else 0.4
+        # formula= is a named formula ("legacy", the default, "tuned", "box", ...)
+        # or an expression over column names, e.g. 0.3 * PTS + 0.2 * AST + Wins / 10
+        formula = request.args.get('formula')
+        try:
+            formula_key = formulas.resolve(formula)[0]
+        except formulas.FormulaError as e:
+            return jsonify({"error": f"Invalid formula: {e}"}), 400
+        except RuntimeError as e:
+            return jsonify({"error": str(e)}), 400
+
+        key = result_key(team_year_stats, lwr_points, lwr_efg, lwr_gs, season_inputs_version(team_year_stats), formula_key)
+        entry = result_cache.get(key)
+        if entry is not None:
+            return cached_response(request, entry)
 
-        lwr_gs = request.args.get('lwr_gs', '50')
-        lwr_gs = int(lwr_gs.strip()) if lwr_gs.strip() else 50
+        try:
+            # Identical cold requests wait for the first one instead of repeating its work
+            entry = flights.do(('result',) + key, build_result, team_year_stats, lwr_points, lwr_efg, lwr_gs, formula)
+            return cached_response(request, entry)
 
+        except formulas.FormulaError as e:
+            return jsonify({"error": f"Invalid formula: {e}"}), 400
+        except Exception as e:
+            return jsonify({"error": f"Error processing player stats: {e}"}), 500
+
+    @app.route('/formulas', methods=['GET'])
+    def named_formulas():
+        # What formula= accepts besides an inline expression
+        return jsonify({
+            'named': dict(formulas.NAMED_FORMULAS, **{formulas.LEGACY: 'calculate_score', formulas.TUNED: 'data/score_weights.json'}),
+            'functions': sorted(formulas.FUNCTIONS),
+            'compiled': formulas.plan_cache.stats(),
+        })
+
+    @app.route('/results', methods=['GET'])
+    def results():
+        # Every requested season, streamed as NDJSON, e.g.
+        # /results?years=2000-2024&lwr_points=20&fields=Player,MVP Score
+        # Gzipped when the client accepts it (or asks with gzip=1).
+        try:
+            years = parse_years(request.args.get('years', ''))
+            thresholds = parse_thresholds(request.args)
+        except ValueError as e:
+            return jsonify({"error": f"Invalid parameter: {e}"}), 400
+
+        fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()] or RESULT_FIELDS
+        unknown = [field for field in fields if field not in RESULT_FIELDS]
+        if unknown:
+            return jsonify({"error": f"Unknown fields {unknown}; choose from {RESULT_FIELDS}"}), 400
+
+        body = stream_with_context(ndjson_seasons(years, thresholds, fields))
+        response = Response(mimetype='application/x-ndjson')
+        if request.args.get('gzip') == '1' or 'gzip' in request.accept_encodings:
+            body = gzip_stream(body)
+            response.headers['Content-Encoding'] = 'gzip'
+        response.response = body
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+
+    @app.route('/result/cache', methods=['GET'])
+    def result_cache_stats():
+        stats = result_cache.stats()
+        stats['single_flight'] = flights.stats()
+        return jsonify(stats)
+
+    @app.route('/result/sweep', methods=['GET'])
+    def result_sweep():
+        # Rankings for every combination of the given thresholds, e.g.
+        # /result/sweep?year=2024&lwr_points=10,15,20&lwr_efg=40,50&lwr_gs=0,50
+        team_year_stats = request.args.get('year')
         if not team_year_stats:
-            return redirect(url_for('index'))
+            return jsonify({"error": "Missing required parameter: year"}), 400
 
         try:
-            all_teams = get_team_stats_by_year(team_year_stats)
-            filtered_player_data, mvp = get_filtered_player_data(team_year_stats, lwr_points, lwr_gs, lwr_efg)
-            result_data = []
-            for name in filtered_player_data['Player']:
-                player = get_mvp_data(filtered_player_data, name)
-                if player is None:
-                    continue
+            team_year_stats = parse_year(team_year_stats)
+        except ValueError as e:
+            return jsonify({"error": f"Invalid parameter: {e}"}), 400
 
-                player_team = get_team(all_teams, str(player[2]))
-                if not player_team:
-                    continue
+        try:
+            points_grid = parse_grid(request.args.get('lwr_points'), 15.0, float)
+            efg_grid = parse_grid(request.args.get('lwr_efg'), 0.4, float, 0.01)
+            gs_grid = parse_grid(request.args.get('lwr_gs'), 50, int)
+        except ValueError as e:
+            return jsonify({"error": f"Invalid threshold: {e}"}), 400
 
-                player_fullstats = list(player) + [player_team['Wins'], player_team['Rank']]
-                result_data.append({
-                    'Player': name,
-                    'MVP Score': round(calculate_score(player_fullstats), 2),
-                    'MVP': (name == mvp)
-                })
+        combinations = len(points_grid) * len(efg_grid) * len(gs_grid)
+        if combinations > MAX_SWEEP_COMBINATIONS:
+            return jsonify({"error": f"{combinations} threshold combinations requested; at most {MAX_SWEEP_COMBINATIONS} per sweep"}), 400
 
-            result_data_sorted = sorted(result_data, key=lambda x: x['MVP Score'], reverse=True)
-            unique_result_data = list({player['Player']: player for player in result_data_sorted}.values())
+        try:
+            all_teams, index, mvp = load_season_inputs(team_year_stats)
+
+            sweep_data = []
+            for (lwr_points, lwr_gs, lwr_efg), filtered_player_data in index.sweep(points_grid, gs_grid, efg_grid):
+                sweep_data.append({
+                    'lwr_points': lwr_points,
+                    'lwr_efg': round(lwr_efg * 100, 2),
+                    'lwr_gs': lwr_gs,
+                    'results': rank_season(filtered_player_data, all_teams, mvp)
+                })
 
-            return jsonify(unique_result_data)
+            return jsonify(sweep_data)
 
         except Exception as e:
             return jsonify({"error": f"Error processing player stats: {e}"}), 500
 
+    @app.route('/predict', methods=['GET'])
+    def predict():
+        # Model probabilities for a season next to its /result ranking, e.g.
+        # /predict?year=2016&lwr_points=20; /predict?year=all scores every player-season
+        year = request.args.get('year', '').strip()
+        if not year:
+            return jsonify({"error": "Missing required parameter: year"}), 400
+
+        try:
+            thresholds = parse_thresholds(request.args)
+            if year != 'all':
+                year = cache_manager.season_year(year)
+        except ValueError as e:
+            return jsonify({"error": f"Invalid parameter: {e}"}), 400
+
+        try:
+            model = mvp_model.load_model()
+            if year == 'all':
+                return jsonify({'model': model.describe(), 'predictions': mvp_model.predict_all()})
+
+            predictions = mvp_model.predict_season(year)
+            try:
+                ranking = mvp_model.with_probabilities(season_result(year, *thresholds), predictions)
+            except Exception as e:
+                ranking = {"error": f"Error processing player stats: {e}"}
+            return jsonify({'model': model.describe(), 'year': year, 'predictions': predictions, 'ranking': ranking})
+
+        except ValueError as e:
+            return jsonify({"error": f"Invalid parameter: {e}"}), 400
+        except Exception as e:
+            return jsonify({"error": f"Error predicting MVP: {e}"}), 500
+
+    @app.route('/upstream/stats', methods=['GET'])
+    def upstream_stats():
+        # Per-host request, error, retry and latency counters from the fetch layer
+        return jsonify(fetch.stats())
+
+    @app.route('/cache/stats', methods=['GET'])
+    def disk_cache_stats():
+        # Hits, misses, expiries, evictions and bytes per on-disk cache, plus the shared tables in use
+        stats = cache_manager.stats()
+        stats['shared_tables'] = shared_tables.status()
+        return jsonify(stats)
+
     @app.route('/static/<path:path>')
     def serve_static(path):
         return send_from_directory(os.path.join(app.root_path, 'static'), path)